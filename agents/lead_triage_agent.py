@@ -346,12 +346,14 @@ class LeadTriageAgent(BaseAgent):
     
     async def _score_engagement_level(self, lead_data: Dict[str, Any]) -> float:
         """Score based on engagement indicators (0-100)"""
+        # Counters arrive flat, or nested under "engagement" in serialized LeadData
+        counters = lead_data.get("engagement") or lead_data
         engagement_indicators = {
-            "email_opens": lead_data.get("email_opens", 0),
-            "website_visits": lead_data.get("website_visits", 0),
-            "content_downloads": lead_data.get("content_downloads", 0),
-            "demo_requests": lead_data.get("demo_requests", 0),
-            "contact_form_fills": lead_data.get("contact_form_fills", 0)
+            "email_opens": counters.get("email_opens") or 0,
+            "website_visits": counters.get("website_visits") or 0,
+            "content_downloads": counters.get("content_downloads") or 0,
+            "demo_requests": counters.get("demo_requests") or 0,
+            "contact_form_fills": counters.get("contact_form_fills") or 0
         }
         
         # Calculate engagement score based on activity
@@ -5,17 +5,31 @@ Handles agent authentication and token verification for the MCP server.
 """
 
 import jwt
+import asyncio
 import hashlib
+import time
+from concurrent.futures import Executor
 from datetime import datetime, timedelta
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Tuple
 import logging
 
+from cachetools import TTLCache
+
 logger = logging.getLogger(__name__)
 
 # Demo secret key - in production, use secure key management
 SECRET_KEY = "marketing_agents_demo_key_2025"
 ALGORITHM = "HS256"
 
+# Asymmetric signatures are costly enough to be worth verifying off the event
+# loop; HMAC (HS*) verification is cheaper than handing the token to a process
+ASYMMETRIC_ALGORITHM = ALGORITHM[:2] in ("RS", "ES", "PS")
+
+# Verified tokens are reused for a few seconds so repeated calls with the same
+# bearer token skip signature verification
+TOKEN_CACHE_TTL = 5
+_token_cache: TTLCache = TTLCache(maxsize=10000, ttl=TOKEN_CACHE_TTL)
+
 # Demo agent credentials
 DEMO_AGENTS = {
     "lead_triage_001": {
@@ -55,8 +69,8 @@ def create_demo_token(agent_id: str) -> str:
     return token
 
 
-async def verify_token(token: str) -> Optional[Dict[str, Any]]:
-    """Verify JWT token and return agent info"""
+def _decode_token(token: str) -> Optional[Tuple[Dict[str, Any], float]]:
+    """Verify JWT token and return agent info with the token expiry"""
     try:
         # Decode JWT token
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
@@ -73,11 +87,12 @@ async def verify_token(token: str) -> Optional[Dict[str, Any]]:
             logger.warning(f"Token for unknown agent: {agent_id}")
             return None
         
-        return {
+        agent_info = {
             "agent_id": payload["agent_id"],
             "agent_type": payload["agent_type"],
             "permissions": payload["permissions"]
         }
+        return agent_info, float(payload.get("exp", 0))
         
     except jwt.ExpiredSignatureError:
         logger.warning("Token has expired")
@@ -90,6 +105,38 @@ async def verify_token(token: str) -> Optional[Dict[str, Any]]:
         return None
 
 
+async def verify_token(token: str) -> Optional[Dict[str, Any]]:
+    """Verify JWT token and return agent info"""
+    decoded = _decode_token(token)
+    return decoded[0] if decoded else None
+
+
+async def verify_token_cached(token: str, executor: Optional[Executor] = None) -> Optional[Dict[str, Any]]:
+    """Verify JWT token, reusing a recent successful verification of the same token
+    
+    Cache misses are decoded in ``executor`` when one is given.
+    """
+    key = hashlib.blake2b(token.encode(), digest_size=16).digest()
+    
+    cached = _token_cache.get(key)
+    if cached is not None:
+        agent_info, expires_at = cached
+        if expires_at > time.time():
+            return agent_info
+        _token_cache.pop(key, None)
+    
+    if executor is not None:
+        decoded = await asyncio.get_running_loop().run_in_executor(executor, _decode_token, token)
+    else:
+        decoded = _decode_token(token)
+    if not decoded:
+        # Failed verifications are never cached
+        return None
+    
+    _token_cache[key] = decoded
+    return decoded[0]
+
+
 async def get_current_agent(token: str) -> Optional[Dict[str, Any]]:
     """Get current agent info from token (alias for verify_token)"""
     return await verify_token(token)
@@ -4,9 +4,16 @@ API Models
 Pydantic models for request/response validation and OpenAPI documentation.
 """
 
-from typing import Dict, Any, List, Optional, Union
+from typing import Annotated, Dict, Any, List, Optional, Union
 from datetime import datetime
-from pydantic import BaseModel, Field
+import time
+import orjson
+import msgspec
+from pydantic import (
+    BaseModel, BeforeValidator, ConfigDict, Field, NaiveDatetime, SkipValidation, StrictInt, StrictStr,
+    TypeAdapter, model_validator
+)
+from pydantic.dataclasses import dataclass
 from enum import Enum
 
 
@@ -43,17 +50,41 @@ class LeadStatus(str, Enum):
     CONVERTED = "Converted"
 
 
+def _now_ns() -> int:
+    """Current wall-clock time as integer nanoseconds since the epoch"""
+    return time.time_ns()
+
+
+def _to_epoch_ns(value: Any) -> Any:
+    """Convert a datetime or ISO 8601 string to epoch nanoseconds; other values pass through"""
+    if isinstance(value, str):
+        try:
+            value = datetime.fromisoformat(value)
+        except ValueError:
+            return value
+    if isinstance(value, datetime):
+        # Naive datetimes are local time, as datetime.now() produced them
+        return int(value.timestamp()) * 1_000_000_000 + value.microsecond * 1000
+    return value
+
+
+# Epoch nanoseconds, also accepting the datetime / ISO 8601 timestamps older clients send
+EpochNanos = Annotated[int, BeforeValidator(_to_epoch_ns)]
+
+
 # Base models
 class BaseRequest(BaseModel):
     """Base request model"""
-    timestamp: Optional[datetime] = Field(default_factory=datetime.now)
+    timestamp: Optional[EpochNanos] = Field(default_factory=_now_ns, description="Epoch timestamp in nanoseconds")
     request_id: Optional[str] = None
 
 
 class BaseResponse(BaseModel):
     """Base response model"""
+    model_config = ConfigDict(frozen=True)
+    
     success: bool
-    timestamp: datetime = Field(default_factory=datetime.now)
+    timestamp: int = Field(default_factory=_now_ns, description="Epoch timestamp in nanoseconds")
     message: Optional[str] = None
 
 
@@ -62,19 +93,51 @@ class MCPRequest(BaseModel):
     """JSON-RPC 2.0 request model"""
     jsonrpc: str = Field(default="2.0", description="JSON-RPC version")
     method: str = Field(..., description="Method name to call")
-    params: Optional[Dict[str, Any]] = Field(default={}, description="Method parameters")
-    id: Optional[Union[str, int]] = Field(default=None, description="Request ID")
+    params: Optional[Dict[str, Any]] = Field(default_factory=dict, description="Method parameters")
+    # Numeric ids are the common case; strict members keep "1" from being coerced to 1
+    id: Optional[Union[StrictInt, StrictStr]] = Field(default=None, union_mode="left_to_right", description="Request ID")
 
 
-class MCPResponse(BaseModel):
+@dataclass(slots=True, frozen=True, kw_only=True)
+class MCPResponse:
     """JSON-RPC 2.0 response model"""
     jsonrpc: str = Field(default="2.0", description="JSON-RPC version")
     result: Optional[Dict[str, Any]] = Field(default=None, description="Method result")
     error: Optional[Dict[str, Any]] = Field(default=None, description="Error information")
-    id: Optional[Union[str, int]] = Field(default=None, description="Request ID")
+    # Numeric ids are the common case; strict members keep "1" from being coerced to 1
+    id: Optional[Union[StrictInt, StrictStr]] = Field(default=None, union_mode="left_to_right", description="Request ID")
 
 
 # Agent models
+# Engagement counters that callers may still send at the top level of a lead payload
+ENGAGEMENT_FIELDS = ("email_opens", "website_visits", "content_downloads", "demo_requests", "contact_form_fills")
+
+
+def _nest_engagement(data: Any) -> Any:
+    """Move flat engagement counter keys of a lead payload into its "engagement" object"""
+    if not isinstance(data, dict) or not any(name in data for name in ENGAGEMENT_FIELDS):
+        return data
+    
+    data = dict(data)
+    engagement = dict(data.get("engagement") or {})
+    for name in ENGAGEMENT_FIELDS:
+        value = data.pop(name, None)
+        # A nested value wins over a flat one; None meant "not tracked" in the flat schema
+        if value is not None:
+            engagement.setdefault(name, value)
+    data["engagement"] = engagement
+    return data
+
+
+class EngagementCounters(BaseModel):
+    """Lead engagement counters"""
+    email_opens: int = Field(default=0, description="Number of email opens")
+    website_visits: int = Field(default=0, description="Number of website visits")
+    content_downloads: int = Field(default=0, description="Content download count")
+    demo_requests: int = Field(default=0, description="Demo request count")
+    contact_form_fills: int = Field(default=0, description="Contact form submissions")
+
+
 class LeadData(BaseModel):
     """Lead information model"""
     lead_id: str = Field(..., description="Unique lead identifier")
@@ -84,8 +147,8 @@ class LeadData(BaseModel):
     industry: Optional[str] = Field(None, description="Industry sector")
     source: Optional[str] = Field(None, description="Lead acquisition source")
     campaign_id: Optional[str] = Field(None, description="Associated campaign ID")
-    created_at: Optional[datetime] = Field(None, description="Lead creation timestamp")
-    last_active_at: Optional[datetime] = Field(None, description="Last activity timestamp")
+    created_at: Optional[NaiveDatetime] = Field(None, description="Lead creation timestamp")
+    last_active_at: Optional[NaiveDatetime] = Field(None, description="Last activity timestamp")
     
     # Triage results
     lead_score: Optional[float] = Field(None, ge=0, le=100, description="Lead score (0-100)")
@@ -93,23 +156,29 @@ class LeadData(BaseModel):
     lead_status: Optional[LeadStatus] = Field(None, description="Current lead status")
     
     # Engagement data
-    email_opens: Optional[int] = Field(default=0, description="Number of email opens")
-    website_visits: Optional[int] = Field(default=0, description="Number of website visits")
-    content_downloads: Optional[int] = Field(default=0, description="Content download count")
-    demo_requests: Optional[int] = Field(default=0, description="Demo request count")
-    contact_form_fills: Optional[int] = Field(default=0, description="Contact form submissions")
+    engagement: EngagementCounters = Field(default_factory=EngagementCounters, description="Engagement counters")
+    
+    @model_validator(mode="before")
+    @classmethod
+    def _lift_flat_engagement(cls, data: Any) -> Any:
+        """Accept the flat email_opens/website_visits/... keys older callers send"""
+        return _nest_engagement(data)
 
 
 class AgentActionRequest(BaseModel):
     """Request to execute an agent action"""
     agent_type: AgentType = Field(..., description="Type of agent to execute action")
     action_type: ActionType = Field(..., description="Type of action to perform")
-    context: Dict[str, Any] = Field(..., description="Action context data")
+    context: SkipValidation[dict[str, Any]] = Field(..., description="Action context data")
     conversation_id: Optional[str] = Field(None, description="Conversation identifier")
 
 
-class AgentActionResponse(BaseResponse):
+@dataclass(slots=True, frozen=True, kw_only=True)
+class AgentActionResponse:
     """Response from agent action execution"""
+    success: bool
+    timestamp: int = Field(default_factory=_now_ns, description="Epoch timestamp in nanoseconds")
+    message: Optional[str] = None
     action_id: str = Field(..., description="Unique action identifier")
     agent_type: AgentType = Field(..., description="Agent that executed the action")
     action_type: ActionType = Field(..., description="Type of action performed")
@@ -125,7 +194,7 @@ class HandoffRequest(BaseModel):
     source_agent: AgentType = Field(..., description="Agent initiating handoff")
     target_agent: AgentType = Field(..., description="Agent receiving handoff")
     handoff_reason: str = Field(..., description="Reason for handoff")
-    context_data: Dict[str, Any] = Field(..., description="Context to preserve")
+    context_data: SkipValidation[dict[str, Any]] = Field(..., description="Context to preserve")
 
 
 class HandoffResponse(BaseResponse):
@@ -139,7 +208,7 @@ class EscalationRequest(BaseModel):
     conversation_id: str = Field(..., description="Conversation to escalate")
     agent_type: AgentType = Field(..., description="Agent requesting escalation")
     escalation_reason: str = Field(..., description="Reason for escalation")
-    context: Dict[str, Any] = Field(..., description="Escalation context")
+    context: SkipValidation[dict[str, Any]] = Field(..., description="Escalation context")
     priority: str = Field(default="medium", description="Escalation priority")
 
 
@@ -154,7 +223,7 @@ class MemoryStoreRequest(BaseModel):
     """Request to store data in memory system"""
     memory_type: str = Field(..., description="Type of memory (short_term, long_term, episodic, semantic)")
     key: str = Field(..., description="Memory key/identifier")
-    data: Dict[str, Any] = Field(..., description="Data to store")
+    data: SkipValidation[dict[str, Any]] = Field(..., description="Data to store")
     ttl: Optional[int] = Field(None, description="Time to live in seconds (short-term only)")
 
 
@@ -174,6 +243,8 @@ class MemoryResponse(BaseResponse):
 # Analytics models
 class PerformanceMetrics(BaseModel):
     """System performance metrics"""
+    model_config = ConfigDict(frozen=True)
+    
     total_leads_processed: int = Field(..., description="Total leads processed")
     average_response_time: float = Field(..., description="Average response time in milliseconds")
     conversion_rate: float = Field(..., description="Overall conversion rate")
@@ -184,6 +255,8 @@ class PerformanceMetrics(BaseModel):
 
 class AgentMetrics(BaseModel):
     """Individual agent performance metrics"""
+    model_config = ConfigDict(frozen=True)
+    
     agent_type: AgentType = Field(..., description="Type of agent")
     actions_performed: int = Field(..., description="Total actions performed")
     handoffs_initiated: int = Field(..., description="Number of handoffs initiated")
@@ -195,18 +268,20 @@ class AgentMetrics(BaseModel):
 
 class ConversionAnalytics(BaseModel):
     """Conversion rate analytics"""
+    model_config = ConfigDict(frozen=True, strict=True, defer_build=True)
+    
     overall_rate: float = Field(..., description="Overall conversion rate")
-    by_source: Dict[str, float] = Field(..., description="Conversion rates by lead source")
-    by_agent: Dict[str, float] = Field(..., description="Conversion rates by agent")
-    by_category: Dict[str, float] = Field(..., description="Conversion rates by triage category")
-    by_campaign: Dict[str, float] = Field(..., description="Conversion rates by campaign")
+    by_source: dict[str, float] = Field(..., description="Conversion rates by lead source")
+    by_agent: dict[str, float] = Field(..., description="Conversion rates by agent")
+    by_category: dict[str, float] = Field(..., description="Conversion rates by triage category")
+    by_campaign: dict[str, float] = Field(..., description="Conversion rates by campaign")
 
 
 # Database query models
 class DatabaseQuery(BaseModel):
     """Database query request"""
     table: str = Field(..., description="Table/collection to query")
-    filters: Optional[Dict[str, Any]] = Field(default={}, description="Query filters")
+    filters: Optional[Dict[str, Any]] = Field(default_factory=dict, description="Query filters")
     fields: Optional[List[str]] = Field(default=None, description="Fields to return")
     limit: Optional[int] = Field(default=100, description="Maximum results to return")
     offset: Optional[int] = Field(default=0, description="Results offset for pagination")
@@ -224,7 +299,7 @@ class DatabaseResponse(BaseResponse):
 class ResourceAccess(BaseModel):
     """Resource access log entry"""
     resource_uri: str = Field(..., description="URI of accessed resource")
-    timestamp: datetime = Field(..., description="Access timestamp")
+    timestamp: float = Field(..., description="Access time as a Unix timestamp")
     scope: str = Field(..., description="Access scope (read, write, execute)")
     operation: str = Field(..., description="Operation performed")
     success: bool = Field(..., description="Whether operation succeeded")
@@ -236,23 +311,37 @@ class WebSocketMessage(BaseModel):
     """WebSocket message format"""
     type: str = Field(..., description="Message type")
     data: Dict[str, Any] = Field(..., description="Message payload")
-    timestamp: datetime = Field(default_factory=datetime.now, description="Message timestamp")
+    timestamp: int = Field(default_factory=_now_ns, description="Message timestamp (epoch nanoseconds)")
     sender: Optional[str] = Field(None, description="Message sender")
     targets: Optional[List[str]] = Field(None, description="Target agents for message")
+    
+    def to_bytes(self) -> bytes:
+        """Encode the message as a JSON frame with orjson, bypassing the pydantic serializer"""
+        return orjson.dumps({
+            "type": self.type,
+            "data": self.data,
+            "timestamp": self.timestamp,
+            "sender": self.sender,
+            "targets": self.targets
+        })
 
 
 class AgentStatus(BaseModel):
     """Agent connection status"""
+    model_config = ConfigDict(frozen=True)
+    
     agent_id: str = Field(..., description="Agent identifier")
     agent_type: AgentType = Field(..., description="Type of agent")
     status: str = Field(..., description="Connection status (connected, disconnected)")
-    last_seen: datetime = Field(..., description="Last activity timestamp")
+    last_seen: NaiveDatetime = Field(..., description="Last activity timestamp")
     active_conversations: int = Field(..., description="Number of active conversations")
 
 
 # Configuration models
 class SystemConfig(BaseModel):
     """System configuration"""
+    model_config = ConfigDict(defer_build=True)
+    
     memory_settings: Dict[str, Any] = Field(..., description="Memory system configuration")
     agent_settings: Dict[str, Any] = Field(..., description="Agent configuration")
     security_settings: Dict[str, Any] = Field(..., description="Security configuration")
@@ -261,26 +350,96 @@ class SystemConfig(BaseModel):
 
 class HealthCheck(BaseModel):
     """System health check response"""
+    model_config = ConfigDict(frozen=True, defer_build=True)
+    
     status: str = Field(..., description="Overall system status")
-    timestamp: datetime = Field(default_factory=datetime.now, description="Health check timestamp")
+    timestamp: int = Field(default_factory=_now_ns, description="Health check timestamp (epoch nanoseconds)")
     version: str = Field(..., description="System version")
     components: Dict[str, str] = Field(..., description="Component health status")
     uptime: float = Field(..., description="System uptime in seconds")
-    memory_usage: Dict[str, float] = Field(..., description="Memory usage statistics")
+    memory_usage: dict[str, float] = Field(..., description="Memory usage statistics")
 
 
 # Error models
 class ErrorDetail(BaseModel):
     """Detailed error information"""
+    model_config = ConfigDict(frozen=True, defer_build=True)
+    
     error_code: str = Field(..., description="Error code")
     error_message: str = Field(..., description="Human-readable error message")
     error_details: Optional[Dict[str, Any]] = Field(None, description="Additional error details")
-    timestamp: datetime = Field(default_factory=datetime.now, description="Error timestamp")
+    timestamp: int = Field(default_factory=_now_ns, description="Error timestamp (epoch nanoseconds)")
     request_id: Optional[str] = Field(None, description="Associated request ID")
 
 
 class ValidationError(BaseModel):
     """Validation error details"""
+    model_config = ConfigDict(frozen=True, defer_build=True)
+    
     field: str = Field(..., description="Field with validation error")
     message: str = Field(..., description="Validation error message")
     invalid_value: Optional[Any] = Field(None, description="Invalid value provided")
+
+
+# Passthrough variants
+# Decoded with msgspec for forwarding: context/filters stay as the raw JSON
+# bytes from the request body and are only parsed if something inspects them.
+class AgentActionRequestFast(msgspec.Struct):
+    """AgentActionRequest with an unparsed context payload"""
+    agent_type: AgentType
+    action_type: ActionType
+    context: msgspec.Raw
+    conversation_id: Optional[str] = None
+
+
+class DatabaseQueryFast(msgspec.Struct):
+    """DatabaseQuery with unparsed filters"""
+    table: str
+    filters: msgspec.Raw = msgspec.Raw(b"{}")
+    fields: Optional[List[str]] = None
+    limit: Optional[int] = 100
+    offset: Optional[int] = 0
+    sort: Optional[Dict[str, str]] = None
+
+
+# JSON-RPC wire types
+# /rpc decodes and encodes these with msgspec; MCPRequest/MCPResponse remain the
+# documented schema.
+class MCPRequestFast(msgspec.Struct, kw_only=True):
+    """MCPRequest decoded with msgspec"""
+    jsonrpc: str = "2.0"
+    method: str
+    params: Optional[Dict[str, Any]] = {}
+    id: Optional[Union[int, str]] = None
+
+
+class MCPResponseFast(msgspec.Struct, kw_only=True):
+    """MCPResponse encoded with msgspec"""
+    jsonrpc: str = "2.0"
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[Dict[str, Any]] = None
+    id: Optional[Union[int, str]] = None
+
+
+def validate_lead_batch(items: List[Dict[str, Any]]) -> List[LeadData]:
+    """Validate a batch of lead payloads with a single adapter call"""
+    return LEAD_BATCH_ADAPTER.validate_python(items)
+
+
+AGENT_ACTION_REQUEST_DECODER = msgspec.json.Decoder(AgentActionRequestFast)
+DATABASE_QUERY_DECODER = msgspec.json.Decoder(DatabaseQueryFast)
+MCP_REQUEST_DECODER = msgspec.json.Decoder(MCPRequestFast)
+MCP_RESPONSE_ENCODER = msgspec.json.Encoder(enc_hook=str)
+
+
+# Pre-built validators
+# Route handlers reuse these instead of constructing models per request, so the
+# underlying pydantic-core validator is built once at import time.
+MCP_REQUEST_ADAPTER = TypeAdapter(MCPRequest)
+LEAD_DATA_ADAPTER = TypeAdapter(LeadData)
+LEAD_LIST_ADAPTER = TypeAdapter(list[LeadData])
+LEAD_BATCH_ADAPTER = LEAD_LIST_ADAPTER  # bulk ingestion validates the whole list in one call
+AGENT_ACTION_REQUEST_ADAPTER = TypeAdapter(AgentActionRequest)
+HANDOFF_REQUEST_ADAPTER = TypeAdapter(HandoffRequest)
+ESCALATION_REQUEST_ADAPTER = TypeAdapter(EscalationRequest)
+MEMORY_STORE_REQUEST_ADAPTER = TypeAdapter(MemoryStoreRequest)
@@ -6,22 +6,50 @@ Implements JSON-RPC 2.0 protocol for inter-agent communication.
 """
 
 from typing import Dict, Any, List, Optional
-import json
 import asyncio
+import csv
+import itertools
 import logging
-from datetime import datetime
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
 import uuid
 
-from fastapi import FastAPI, WebSocket, HTTPException, Depends
+from fastapi import FastAPI, Request, WebSocket, HTTPException, Depends, Query
+from fastapi.exceptions import RequestValidationError
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+import orjson
+import msgspec
 import uvicorn
 
+try:
+    import uvloop
+except ImportError:
+    uvloop = None
+
+try:
+    import httptools
+except ImportError:
+    httptools = None
+
+try:
+    import redis.asyncio as redis
+except ImportError:
+    redis = None
+
 from transport.json_rpc_server import JSONRPCServer
 from transport.websocket_manager import WebSocketManager
 from memory_systems.memory_manager import MemoryManager
-from api.auth import verify_token, get_current_agent
-from api.models import MCPRequest, MCPResponse, ResourceAccess
+from api.auth import ASYMMETRIC_ALGORITHM, verify_token_cached, get_current_agent
+from api.models import (
+    LeadData, MCPRequest, MCPResponseFast, ResourceAccess, WebSocketMessage,
+    MCP_REQUEST_DECODER, MCP_RESPONSE_ENCODER, LEAD_LIST_ADAPTER, validate_lead_batch
+)
 
 
 # Initialize logging
@@ -31,6 +59,62 @@ logger = logging.getLogger(__name__)
 # Security
 security = HTTPBearer()
 
+# Event loop and protocol implementations for single and multi-worker runs
+UVICORN_RUNTIME = {
+    "loop": "uvloop" if uvloop is not None else "asyncio",
+    "http": "httptools" if httptools is not None else "h11",
+    "ws": "websockets",
+    "ws_per_message_deflate": True,
+}
+
+# Results of the side-effect-free analytics stubs, built once
+PERFORMANCE_METRICS_RESULT = {
+    "metrics": {
+        "total_leads_processed": 0,
+        "average_response_time": 0,
+        "conversion_rate": 0,
+        "active_conversations": 0
+    }
+}
+
+CONVERSION_RATES_RESULT = {
+    "conversion_rates": {
+        "overall": 0,
+        "by_source": {},
+        "by_agent": {},
+        "by_category": {}
+    }
+}
+
+AGENT_METRICS_RESULT = {
+    "agent_metrics": {
+        "actions_performed": 0,
+        "handoffs_initiated": 0,
+        "escalations_created": 0,
+        "average_handling_time": 0
+    }
+}
+
+# Messages buffered per WebSocket between receive, dispatch and send
+WS_PIPELINE_DEPTH = 64
+
+# Escalation ids drawn per os.urandom read
+UUID_POOL_SIZE = 256
+
+# Lead records served by db.leads.query (override with LEADS_DATASET)
+LEADS_DATASET = Path(__file__).resolve().parent.parent / "marketing_multi_agent_dataset_v1_final" / "leads.csv"
+
+# Redis stream shared by all workers for the resource access log
+ACCESS_LOG_STREAM = "mcp:access_log"
+ACCESS_LOG_MAXLEN = 10000
+
+
+class ORJSONResponse(JSONResponse):
+    """JSON response rendered with orjson"""
+    
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, default=str, option=orjson.OPT_SERIALIZE_NUMPY)
+
 
 class MCPServer:
     """
@@ -43,11 +127,12 @@ class MCPServer:
     - Agent communication infrastructure
     """
     
-    def __init__(self):
+    def __init__(self, redis_url: Optional[str] = None):
         self.app = FastAPI(
             title="Marketing Multi-Agent MCP Server",
             description="Model Context Protocol server for marketing agent system",
-            version="1.0.0"
+            version="1.0.0",
+            default_response_class=ORJSONResponse
         )
         
         # Core components
@@ -55,8 +140,40 @@ class MCPServer:
         self.ws_manager = WebSocketManager()
         self.memory_manager = MemoryManager()
         
+        # Signature checks for cache-missed tokens run in worker processes
+        self._jwt_pool: Optional[ProcessPoolExecutor] = (
+            ProcessPoolExecutor(max_workers=os.cpu_count()) if ASYMMETRIC_ALGORITHM else None
+        )
+        
+        # Fire-and-forget sends; held here so pending tasks are not collected
+        self._background_tasks: set[asyncio.Task] = set()
+        
+        # Escalation ids, generated in bulk
+        self._uuid_iter = self._uuid_pool()
+        
+        # Pre-encoded /health body and the time it was built
+        self._health_cache: tuple[float, bytes] = (0.0, b"")
+        
         # Resource access tracking
-        self.resource_access_log: List[ResourceAccess] = []
+        self.resource_access_log: deque[ResourceAccess] = deque(maxlen=10000)
+        self._log_queue: asyncio.Queue[tuple] = asyncio.Queue(maxsize=50000)
+        self._log_consumer: Optional[asyncio.Task] = None
+        
+        # Lead dataset, validated on the first db.leads.query
+        self.leads_path = os.environ.get("LEADS_DATASET", str(LEADS_DATASET))
+        self._leads: Optional[List[LeadData]] = None
+        self._leads_lock = asyncio.Lock()
+        
+        # Shared state for multi-worker deployments (access log, broadcasts)
+        self.redis_url = redis_url or os.environ.get("REDIS_URL")
+        self.redis_client = None
+        
+        # Drain queued access records under any ASGI runner
+        self.app.router.add_event_handler("startup", self._connect_shared_state)
+        self.app.router.add_event_handler("startup", self._start_log_consumer)
+        self.app.router.add_event_handler("shutdown", self._stop_log_consumer)
+        self.app.router.add_event_handler("shutdown", self._close_shared_state)
+        self.app.router.add_event_handler("shutdown", self._shutdown_jwt_pool)
         
         # Setup middleware and routes
         self._setup_middleware()
@@ -72,33 +189,67 @@ class MCPServer:
             allow_methods=["*"],
             allow_headers=["*"],
         )
+        
+        # Access log pages are large and repetitive; small bodies are sent as-is
+        self.app.add_middleware(GZipMiddleware, minimum_size=1024, compresslevel=5)
     
     def _setup_routes(self):
         """Setup HTTP endpoints"""
         
+        async def current_agent(
+            credentials: HTTPAuthorizationCredentials = Depends(security)
+        ) -> Dict[str, Any]:
+            """Resolve the authenticated agent (cached per request by FastAPI)"""
+            agent_info = await verify_token_cached(credentials.credentials, self._jwt_pool)
+            if not agent_info:
+                raise HTTPException(status_code=401, detail="Invalid authentication")
+            return agent_info
+        
         @self.app.get("/health")
         async def health_check():
             """Health check endpoint"""
-            return {
-                "status": "healthy",
-                "timestamp": datetime.now().isoformat(),
-                "version": "1.0.0"
+            
+            # Probes within the same second share one encoded body
+            now = time.time()
+            built_at, body = self._health_cache
+            if now - built_at >= 1.0:
+                body = orjson.dumps({
+                    "status": "healthy",
+                    "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(now)),
+                    "version": "1.0.0"
+                })
+                self._health_cache = (now, body)
+            
+            return Response(body, media_type="application/json")
+        
+        @self.app.post(
+            "/rpc",
+            openapi_extra={
+                "requestBody": {
+                    "required": True,
+                    "content": {"application/json": {"schema": MCPRequest.model_json_schema()}}
+                }
             }
-        
-        @self.app.post("/rpc")
+        )
         async def handle_rpc(
-            request: MCPRequest,
-            credentials: HTTPAuthorizationCredentials = Depends(security)
+            raw_request: Request,
+            agent_info: Dict[str, Any] = Depends(current_agent)
         ):
             """Handle JSON-RPC 2.0 requests over HTTP"""
             
-            # Verify authentication
-            agent_info = await verify_token(credentials.credentials)
-            if not agent_info:
-                raise HTTPException(status_code=401, detail="Invalid authentication")
+            # Decode body bytes straight into the msgspec wire type
+            try:
+                request = MCP_REQUEST_DECODER.decode(await raw_request.body())
+            except msgspec.DecodeError as e:
+                raise RequestValidationError([{
+                    "type": "value_error",
+                    "loc": ("body",),
+                    "msg": str(e),
+                    "input": None
+                }])
             
             # Log resource access
-            await self._log_resource_access(
+            self._log_resource_access(
                 resource_uri="rpc://jsonrpc",
                 scope="execute",
                 operation=request.method,
@@ -115,22 +266,23 @@ class MCPServer:
                     agent_context=agent_info
                 )
                 
-                return MCPResponse(
-                    jsonrpc="2.0",
-                    result=response,
-                    id=request.id
+                return Response(
+                    MCP_RESPONSE_ENCODER.encode(MCPResponseFast(result=response, id=request.id)),
+                    media_type="application/json"
                 )
                 
             except Exception as e:
                 logger.error(f"RPC Error: {e}")
-                return MCPResponse(
-                    jsonrpc="2.0",
-                    error={
-                        "code": -32603,
-                        "message": "Internal error",
-                        "data": str(e)
-                    },
-                    id=request.id
+                return Response(
+                    MCP_RESPONSE_ENCODER.encode(MCPResponseFast(
+                        error={
+                            "code": -32603,
+                            "message": "Internal error",
+                            "data": str(e)
+                        },
+                        id=request.id
+                    )),
+                    media_type="application/json"
                 )
         
         @self.app.websocket("/ws/{agent_id}")
@@ -146,14 +298,18 @@ class MCPServer:
             # Register agent with WebSocket manager
             await self.ws_manager.connect_agent(agent_id, websocket)
             
-            try:
+            # Receive, dispatch and send run as a pipeline; a single worker
+            # and a single writer keep replies in request order
+            inbox: asyncio.Queue = asyncio.Queue(maxsize=WS_PIPELINE_DEPTH)
+            outbox: asyncio.Queue = asyncio.Queue(maxsize=WS_PIPELINE_DEPTH)
+            
+            async def worker():
+                """Process messages in arrival order"""
                 while True:
-                    # Receive message from agent
-                    data = await websocket.receive_text()
-                    message = json.loads(data)
+                    message = await inbox.get()
                     
                     # Log WebSocket activity
-                    await self._log_resource_access(
+                    self._log_resource_access(
                         resource_uri=f"ws://agent/{agent_id}",
                         scope="send_message",
                         operation="websocket_message",
@@ -171,11 +327,11 @@ class MCPServer:
                             agent_context={"agent_id": agent_id}
                         )
                         
-                        await websocket.send_text(json.dumps({
+                        await outbox.put(orjson.dumps({
                             "type": "rpc_response",
                             "result": response,
                             "id": message.get("id")
-                        }))
+                        }, default=str))
                     
                     elif message.get("type") == "broadcast":
                         # Broadcast message to other agents
@@ -185,73 +341,114 @@ class MCPServer:
                             target_agents=message.get("targets")
                         )
             
+            async def writer():
+                """Send replies in the order they were produced"""
+                while True:
+                    await websocket.send_bytes(await outbox.get())
+            
+            stages = [asyncio.create_task(worker()), asyncio.create_task(writer())]
+            
+            try:
+                # Receive and decode the next frame while earlier ones are processed
+                while True:
+                    message = orjson.loads(await websocket.receive_bytes())
+                    
+                    for stage in stages:
+                        if stage.done():
+                            stage.result()
+                    
+                    try:
+                        inbox.put_nowait(message)
+                    except asyncio.QueueFull:
+                        # Client keeps sending without reading its replies
+                        logger.warning(f"Closing WebSocket for agent {agent_id}: too many pending messages")
+                        await websocket.close(code=1008)
+                        break
+            
             except Exception as e:
                 logger.error(f"WebSocket error for agent {agent_id}: {e}")
             
             finally:
                 # Disconnect agent
                 await self.ws_manager.disconnect_agent(agent_id)
+                
+                for stage in stages:
+                    stage.cancel()
+                await asyncio.gather(*stages, return_exceptions=True)
         
         @self.app.get("/agents/status")
         async def get_agents_status(
-            credentials: HTTPAuthorizationCredentials = Depends(security)
+            agent_info: Dict[str, Any] = Depends(current_agent)
         ):
             """Get status of all connected agents"""
             
-            agent_info = await verify_token(credentials.credentials)
-            if not agent_info:
-                raise HTTPException(status_code=401, detail="Invalid authentication")
-            
             return await self.ws_manager.get_agents_status()
         
         @self.app.get("/resources/access-log")
         async def get_resource_access_log(
-            credentials: HTTPAuthorizationCredentials = Depends(security),
-            limit: int = 100
+            agent_info: Dict[str, Any] = Depends(current_agent),
+            limit: int = Query(100, ge=1, le=ACCESS_LOG_MAXLEN)
         ):
-            """Get recent resource access logs"""
+            """Stream recent resource access logs as newline-delimited JSON
             
-            agent_info = await verify_token(credentials.credentials)
-            if not agent_info:
-                raise HTTPException(status_code=401, detail="Invalid authentication")
+            Records are oldest first; the log size is in the X-Total-Entries header.
+            """
             
-            return {
-                "access_log": self.resource_access_log[-limit:],
-                "total_entries": len(self.resource_access_log)
-            }
+            if self.redis_client is not None:
+                entries = await self.redis_client.xrevrange(ACCESS_LOG_STREAM, count=limit)
+                total_entries = await self.redis_client.xlen(ACCESS_LOG_STREAM)
+                
+                async def generate():
+                    # Stream entries already hold the encoded record
+                    for _, fields in reversed(entries):
+                        yield fields[b"record"] + b"\n"
+            else:
+                # Snapshot references only; the consumer may append while streaming
+                records = list(itertools.islice(reversed(self.resource_access_log), limit))
+                total_entries = len(self.resource_access_log)
+                
+                async def generate():
+                    for record in reversed(records):
+                        yield orjson.dumps(record.model_dump()) + b"\n"
+            
+            return StreamingResponse(
+                generate(),
+                media_type="application/x-ndjson",
+                headers={"X-Total-Entries": str(total_entries)}
+            )
     
     def _setup_rpc_methods(self):
         """Register RPC methods with the JSON-RPC server"""
         
         # Database access methods
-        self.rpc_server.register_method("db.leads.query", self._query_leads)
-        self.rpc_server.register_method("db.campaigns.query", self._query_campaigns)
-        self.rpc_server.register_method("db.interactions.query", self._query_interactions)
-        self.rpc_server.register_method("db.conversions.query", self._query_conversions)
+        self.rpc_server.register_method("db.leads.query", self._query_leads, params_as_dict=True)
+        self.rpc_server.register_method("db.campaigns.query", self._query_campaigns, params_as_dict=True)
+        self.rpc_server.register_method("db.interactions.query", self._query_interactions, params_as_dict=True)
+        self.rpc_server.register_method("db.conversions.query", self._query_conversions, params_as_dict=True)
         
         # Memory system methods
-        self.rpc_server.register_method("memory.short_term.get", self._get_short_term_memory)
-        self.rpc_server.register_method("memory.short_term.store", self._store_short_term_memory)
-        self.rpc_server.register_method("memory.long_term.get", self._get_long_term_memory)
-        self.rpc_server.register_method("memory.long_term.store", self._store_long_term_memory)
-        self.rpc_server.register_method("memory.episodic.search", self._search_episodic_memory)
-        self.rpc_server.register_method("memory.semantic.query", self._query_semantic_memory)
+        self.rpc_server.register_method("memory.short_term.get", self._get_short_term_memory, params_as_dict=True)
+        self.rpc_server.register_method("memory.short_term.store", self._store_short_term_memory, params_as_dict=True)
+        self.rpc_server.register_method("memory.long_term.get", self._get_long_term_memory, params_as_dict=True)
+        self.rpc_server.register_method("memory.long_term.store", self._store_long_term_memory, params_as_dict=True)
+        self.rpc_server.register_method("memory.episodic.search", self._search_episodic_memory, params_as_dict=True)
+        self.rpc_server.register_method("memory.semantic.query", self._query_semantic_memory, params_as_dict=True)
         
         # Agent communication methods
-        self.rpc_server.register_method("agent.handoff", self._handle_agent_handoff)
-        self.rpc_server.register_method("agent.escalate", self._handle_escalation)
-        self.rpc_server.register_method("agent.broadcast", self._handle_broadcast)
+        self.rpc_server.register_method("agent.handoff", self._handle_agent_handoff, params_as_dict=True)
+        self.rpc_server.register_method("agent.escalate", self._handle_escalation, params_as_dict=True)
+        self.rpc_server.register_method("agent.broadcast", self._handle_broadcast, params_as_dict=True)
         
         # Analytics methods
-        self.rpc_server.register_method("analytics.performance", self._get_performance_metrics)
-        self.rpc_server.register_method("analytics.conversion_rates", self._get_conversion_rates)
-        self.rpc_server.register_method("analytics.agent_metrics", self._get_agent_metrics)
+        self.rpc_server.register_method("analytics.performance", self._get_performance_metrics, params_as_dict=True)
+        self.rpc_server.register_method("analytics.conversion_rates", self._get_conversion_rates, params_as_dict=True)
+        self.rpc_server.register_method("analytics.agent_metrics", self._get_agent_metrics, params_as_dict=True)
     
     # Database access methods
     async def _query_leads(self, params: Dict[str, Any], agent_context: Dict[str, Any]) -> Dict[str, Any]:
         """Query leads database with filtering and pagination"""
         
-        await self._log_resource_access(
+        self._log_resource_access(
             resource_uri="db://leads",
             scope="read",
             operation="SELECT",
@@ -259,18 +456,54 @@ class MCPServer:
             success=True
         )
         
-        # Implement actual database query logic here
-        # For now, return mock data structure
+        leads = await self._load_leads()
+        
+        # Equality filters on LeadData fields, e.g. {"industry": "Retail"}
+        filters = params.get("filters") or {}
+        unknown = set(filters) - set(LeadData.model_fields)
+        if unknown:
+            raise TypeError(f"Unknown lead filter fields: {sorted(unknown)}")
+        if filters:
+            leads = [
+                lead for lead in leads
+                if all(getattr(lead, field) == value for field, value in filters.items())
+            ]
+        
+        offset = max(int(params.get("offset", 0)), 0)
+        limit = max(int(params.get("limit", 100)), 0)
+        
         return {
-            "leads": [],
-            "total_count": 0,
+            "leads": LEAD_LIST_ADAPTER.dump_python(leads[offset:offset + limit], mode="json"),
+            "total_count": len(leads),
             "query_params": params
         }
     
+    async def _load_leads(self) -> List[LeadData]:
+        """Validated lead records from the dataset, read once"""
+        
+        async with self._leads_lock:
+            if self._leads is None:
+                try:
+                    self._leads = await asyncio.to_thread(self._read_leads, self.leads_path)
+                    logger.info(f"Loaded {len(self._leads)} leads from {self.leads_path}")
+                except OSError as e:
+                    logger.warning(f"Lead dataset unavailable: {e} - db.leads.query returns no leads")
+                    self._leads = []
+        return self._leads
+    
+    @staticmethod
+    def _read_leads(path: str) -> List[LeadData]:
+        """Parse the leads CSV and validate every row in one adapter call"""
+        
+        with open(path, newline="", encoding="utf-8") as f:
+            # Empty cells are unknown values, not empty strings
+            rows = [{k: v for k, v in row.items() if v != ""} for row in csv.DictReader(f)]
+        return validate_lead_batch(rows)
+    
     async def _query_campaigns(self, params: Dict[str, Any], agent_context: Dict[str, Any]) -> Dict[str, Any]:
         """Query campaigns database"""
         
-        await self._log_resource_access(
+        self._log_resource_access(
             resource_uri="db://campaigns", 
             scope="read",
             operation="SELECT",
@@ -287,7 +520,7 @@ class MCPServer:
     async def _query_interactions(self, params: Dict[str, Any], agent_context: Dict[str, Any]) -> Dict[str, Any]:
         """Query interactions database"""
         
-        await self._log_resource_access(
+        self._log_resource_access(
             resource_uri="db://interactions",
             scope="read", 
             operation="SELECT",
@@ -304,7 +537,7 @@ class MCPServer:
     async def _query_conversions(self, params: Dict[str, Any], agent_context: Dict[str, Any]) -> Dict[str, Any]:
         """Query conversions database"""
         
-        await self._log_resource_access(
+        self._log_resource_access(
             resource_uri="db://conversions",
             scope="read",
             operation="SELECT", 
@@ -323,7 +556,7 @@ class MCPServer:
         """Retrieve short-term memory"""
         conversation_id = params.get("conversation_id")
         
-        await self._log_resource_access(
+        self._log_resource_access(
             resource_uri="memory://short_term",
             scope="read",
             operation="GET",
@@ -337,7 +570,7 @@ class MCPServer:
     async def _store_short_term_memory(self, params: Dict[str, Any], agent_context: Dict[str, Any]) -> Dict[str, Any]:
         """Store short-term memory"""
         
-        await self._log_resource_access(
+        self._log_resource_access(
             resource_uri="memory://short_term",
             scope="write",
             operation="INSERT", 
@@ -356,7 +589,7 @@ class MCPServer:
     async def _get_long_term_memory(self, params: Dict[str, Any], agent_context: Dict[str, Any]) -> Dict[str, Any]:
         """Retrieve long-term memory"""
         
-        await self._log_resource_access(
+        self._log_resource_access(
             resource_uri="memory://long_term",
             scope="read",
             operation="GET",
@@ -369,7 +602,7 @@ class MCPServer:
     async def _store_long_term_memory(self, params: Dict[str, Any], agent_context: Dict[str, Any]) -> Dict[str, Any]:
         """Store long-term memory"""
         
-        await self._log_resource_access(
+        self._log_resource_access(
             resource_uri="memory://long_term",
             scope="write",
             operation="INSERT",
@@ -382,7 +615,7 @@ class MCPServer:
     async def _search_episodic_memory(self, params: Dict[str, Any], agent_context: Dict[str, Any]) -> Dict[str, Any]:
         """Search episodic memory for similar experiences"""
         
-        await self._log_resource_access(
+        self._log_resource_access(
             resource_uri="memory://episodic",
             scope="search",
             operation="SEARCH",
@@ -400,7 +633,7 @@ class MCPServer:
     async def _query_semantic_memory(self, params: Dict[str, Any], agent_context: Dict[str, Any]) -> Dict[str, Any]:
         """Query semantic knowledge graph"""
         
-        await self._log_resource_access(
+        self._log_resource_access(
             resource_uri="kg://graph",
             scope="read",
             operation="QUERY",
@@ -416,13 +649,18 @@ class MCPServer:
         
         target_agent = params.get("target_agent")
         
-        # Send handoff message via WebSocket
-        await self.ws_manager.send_to_agent(
-            agent_id=target_agent,
-            message={
-                "type": "handoff",
-                "data": params
-            }
+        # Send handoff message via WebSocket without waiting on the target's socket
+        self._run_in_background(
+            self.ws_manager.send_to_agent(
+                agent_id=target_agent,
+                message={
+                    "type": "handoff",
+                    "data": params
+                }
+            ),
+            resource_uri=f"ws://agent/{target_agent}",
+            operation="handoff",
+            actor=agent_context.get("agent_id")
         )
         
         return {"success": True, "handoff_initiated": True}
@@ -432,26 +670,50 @@ class MCPServer:
         
         # Store escalation in queue
         escalation_data = {
-            "escalation_id": str(uuid.uuid4()),
+            "escalation_id": next(self._uuid_iter),
             "agent_id": agent_context.get("agent_id"),
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": time.time(),
             "reason": params.get("reason"),
             "context": params.get("context"),
             "status": "pending"
         }
         
         # In production, this would go to a manager queue/dashboard
-        logger.info(f"Escalation created: {escalation_data}")
+        logger.info(
+            "Escalation created id=%s agent=%s reason=%s",
+            escalation_data["escalation_id"],
+            escalation_data["agent_id"],
+            escalation_data["reason"]
+        )
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Escalation details: %s", escalation_data)
         
         return {"success": True, "escalation_id": escalation_data["escalation_id"]}
     
     async def _handle_broadcast(self, params: Dict[str, Any], agent_context: Dict[str, Any]) -> Dict[str, Any]:
         """Handle broadcast message to multiple agents"""
         
-        await self.ws_manager.broadcast_to_agents(
-            message=params.get("message"),
-            sender=agent_context.get("agent_id"),
-            target_agents=params.get("target_agents")
+        sender = agent_context.get("agent_id")
+        target_agents = params.get("target_agents")
+        
+        # Serialize once here; every recipient gets the same bytes object
+        payload = WebSocketMessage(
+            type="broadcast",
+            data=params.get("message") or {},
+            sender=sender,
+            targets=target_agents
+        ).to_bytes()
+        
+        self._run_in_background(
+            self.ws_manager.broadcast_to_agents(
+                message=params.get("message"),
+                sender=sender,
+                target_agents=target_agents,
+                payload=payload
+            ),
+            resource_uri="ws://broadcast",
+            operation="broadcast",
+            actor=sender
         )
         
         return {"success": True, "broadcast_sent": True}
@@ -460,40 +722,54 @@ class MCPServer:
     async def _get_performance_metrics(self, params: Dict[str, Any], agent_context: Dict[str, Any]) -> Dict[str, Any]:
         """Get system performance metrics"""
         
-        return {
-            "metrics": {
-                "total_leads_processed": 0,
-                "average_response_time": 0,
-                "conversion_rate": 0,
-                "active_conversations": 0
-            }
-        }
+        return PERFORMANCE_METRICS_RESULT
     
     async def _get_conversion_rates(self, params: Dict[str, Any], agent_context: Dict[str, Any]) -> Dict[str, Any]:
         """Get conversion rate analytics"""
         
-        return {
-            "conversion_rates": {
-                "overall": 0,
-                "by_source": {},
-                "by_agent": {},
-                "by_category": {}
-            }
-        }
+        return CONVERSION_RATES_RESULT
     
     async def _get_agent_metrics(self, params: Dict[str, Any], agent_context: Dict[str, Any]) -> Dict[str, Any]:
         """Get individual agent performance metrics"""
         
-        return {
-            "agent_metrics": {
-                "actions_performed": 0,
-                "handoffs_initiated": 0,
-                "escalations_created": 0,
-                "average_handling_time": 0
-            }
-        }
+        return AGENT_METRICS_RESULT
+    
+    def _run_in_background(self, coro, resource_uri: str, operation: str, actor: str) -> asyncio.Task:
+        """Schedule a WebSocket send and record its outcome in the access log"""
+        
+        task = asyncio.create_task(coro)
+        self._background_tasks.add(task)
+        
+        def _on_done(task: asyncio.Task):
+            self._background_tasks.discard(task)
+            if task.cancelled():
+                return
+            
+            error = task.exception()
+            if error is not None:
+                logger.error(f"Background {operation} to {resource_uri} failed: {error}")
+            
+            # send_to_agent returns False when the message was only queued
+            self._log_resource_access(
+                resource_uri=resource_uri,
+                scope="write",
+                operation=operation,
+                actor=actor,
+                success=error is None and task.result() is not False
+            )
+        
+        task.add_done_callback(_on_done)
+        return task
+    
+    def _uuid_pool(self):
+        """Yield random (version 4) UUID hex strings, reading entropy in bulk"""
+        
+        while True:
+            buf = os.urandom(16 * UUID_POOL_SIZE)
+            for start in range(0, len(buf), 16):
+                yield uuid.UUID(bytes=buf[start:start + 16], version=4).hex
     
-    async def _log_resource_access(
+    def _log_resource_access(
         self,
         resource_uri: str,
         scope: str,
@@ -501,22 +777,90 @@ class MCPServer:
         actor: str,
         success: bool
     ):
-        """Log resource access for audit and monitoring"""
-        
-        access_log = ResourceAccess(
-            resource_uri=resource_uri,
-            timestamp=datetime.now(),
-            scope=scope,
-            operation=operation,
-            success=success,
-            actor=actor
-        )
+        """Queue a resource access record without blocking the request"""
+        
+        try:
+            self._log_queue.put_nowait((time.time(), resource_uri, scope, operation, actor, success))
+        except asyncio.QueueFull:
+            # Audit records are best-effort; drop rather than stall requests
+            pass
+    
+    async def _consume_access_log(self):
+        """Move queued access records into the access log (single consumer)"""
+        
+        while True:
+            ts, resource_uri, scope, operation, actor, success = await self._log_queue.get()
+            record = ResourceAccess(
+                resource_uri=resource_uri,
+                timestamp=ts,
+                scope=scope,
+                operation=operation,
+                success=success,
+                actor=actor
+            )
+            
+            if self.redis_client is not None:
+                # Shared across workers; trimmed to roughly the newest 10000
+                try:
+                    await self.redis_client.xadd(
+                        ACCESS_LOG_STREAM,
+                        {"record": orjson.dumps(record.model_dump(mode="json"))},
+                        maxlen=ACCESS_LOG_MAXLEN,
+                        approximate=True
+                    )
+                    continue
+                except Exception as e:
+                    logger.warning(f"Failed to write access log to Redis: {e}")
+            
+            # Bounded deque evicts the oldest entries past 10000
+            self.resource_access_log.append(record)
+    
+    async def _connect_shared_state(self):
+        """Connect to Redis for the shared access log and broadcast bus"""
+        
+        if not self.redis_url:
+            return
+        
+        if redis is None:
+            logger.warning("Redis not available - access log and broadcasts stay per-worker")
+            return
+        
+        try:
+            client = redis.from_url(self.redis_url)
+            await client.ping()
+            await self.ws_manager.attach_redis(client)
+            self.redis_client = client
+            logger.info("Shared server state (Redis) initialized successfully")
+        except Exception as e:
+            logger.warning(f"Redis connection failed: {e} - access log and broadcasts stay per-worker")
+    
+    async def _shutdown_jwt_pool(self):
+        """Stop the JWT verification worker processes"""
+        
+        if self._jwt_pool is not None:
+            self._jwt_pool.shutdown(wait=False, cancel_futures=True)
+            self._jwt_pool = None
+    
+    async def _close_shared_state(self):
+        """Release the shared Redis connection"""
+        
+        if self.redis_client is not None:
+            await self.ws_manager.detach_redis()
+            await self.redis_client.close()
+            self.redis_client = None
+    
+    async def _start_log_consumer(self):
+        """Start the access log consumer task"""
         
-        self.resource_access_log.append(access_log)
+        if self._log_consumer is None or self._log_consumer.done():
+            self._log_consumer = asyncio.create_task(self._consume_access_log())
+    
+    async def _stop_log_consumer(self):
+        """Cancel the access log consumer task"""
         
-        # Keep only last 10000 entries to prevent memory issues
-        if len(self.resource_access_log) > 10000:
-            self.resource_access_log = self.resource_access_log[-5000:]
+        if self._log_consumer is not None:
+            self._log_consumer.cancel()
+            self._log_consumer = None
     
     async def start_server(self, host: str = "0.0.0.0", port: int = 8000):
         """Start the MCP server"""
@@ -531,14 +875,54 @@ class MCPServer:
             app=self.app,
             host=host,
             port=port,
-            log_level="info"
+            log_level="info",
+            **UVICORN_RUNTIME
         )
         
         server = uvicorn.Server(config)
         await server.serve()
 
 
+def create_app() -> FastAPI:
+    """Build the app for one uvicorn worker process"""
+    
+    server = MCPServer()
+    server.app.router.add_event_handler("startup", server.memory_manager.initialize)
+    server.app.router.add_event_handler("shutdown", server.memory_manager.cleanup)
+    return server.app
+
+
+def run_workers(host: str = "0.0.0.0", port: int = 8000, workers: Optional[int] = None):
+    """Run the MCP server across several worker processes"""
+    
+    workers = workers or os.cpu_count() or 1
+    
+    if workers > 1 and not os.environ.get("REDIS_URL"):
+        # Handoffs, broadcasts and agent status only span workers through Redis
+        logger.warning("REDIS_URL not set - running a single worker")
+        workers = 1
+    
+    logger.info(f"Starting MCP Server on {host}:{port} with {workers} workers")
+    
+    uvicorn.run(
+        "mcp_server.server:create_app",
+        factory=True,
+        host=host,
+        port=port,
+        workers=workers,
+        log_level="info",
+        **UVICORN_RUNTIME
+    )
+
+
 # Main entry point
 if __name__ == "__main__":
-    server = MCPServer()
-    asyncio.run(server.start_server())
+    if uvloop is not None:
+        uvloop.install()
+    
+    workers = int(os.environ.get("WORKERS", "1"))
+    if workers > 1:
+        run_workers(workers=workers)
+    else:
+        server = MCPServer()
+        asyncio.run(server.start_server())
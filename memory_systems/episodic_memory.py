@@ -5,24 +5,282 @@ Vector database implementation for storing and retrieving successful interaction
 Uses sentence transformers for semantic similarity matching.
 """
 
-import json
 import asyncio
-from typing import Dict, Any, Optional, List
+import contextlib
+import functools
+import hashlib
+import heapq
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Optional, List, Set, Tuple
 from datetime import datetime
 import logging
 
+import numpy as np
+import orjson
+from cachetools import LRUCache
+
 try:
     from sentence_transformers import SentenceTransformer
 except ImportError:
     SentenceTransformer = None
 
+try:
+    import onnxruntime
+except ImportError:
+    onnxruntime = None
+
+try:
+    import torch
+except ImportError:
+    torch = None
+
 try:
     import chromadb
 except ImportError:
     chromadb = None
 
+try:
+    from chromadb.utils.embedding_functions import ONNXMiniLM_L6_V2
+except ImportError:
+    ONNXMiniLM_L6_V2 = None
+
+try:
+    from usearch.index import Index
+except ImportError:
+    Index = None
+
+try:
+    import numba
+except ImportError:
+    numba = None
+
 logger = logging.getLogger(__name__)
 
+# Episodes per forward pass when encoding a batch
+EMBEDDING_BATCH_SIZE = 64
+
+# How long concurrent query encodes wait to share a forward pass
+EMBEDDING_BATCH_WAIT = 0.005  # seconds
+
+# Rows added at a time to the in-memory embedding matrix
+EMBEDDING_GROWTH_ROWS = 1024
+
+# HNSW parameters for the in-memory ANN index and new ChromaDB collections
+# (M, ef_construction, ef_search); raise ef_search for higher recall
+ANN_CONNECTIVITY = 32
+ANN_EXPANSION_ADD = 200
+ANN_EXPANSION_SEARCH = 64
+
+# Vector storage type inside the ANN index ("f32", "f16" or "i8"). INT8 quarters
+# the bytes streamed per distance; its candidates are re-ranked against FP32 rows
+ANN_DTYPE = "i8"
+
+# Candidates taken from an INT8 index and re-scored with the exact FP32 embeddings
+ANN_RERANK_CANDIDATES = 20
+
+# Filters are applied to ANN hits, so filtered searches fetch this many times the limit
+ANN_FILTER_OVERFETCH = 10
+
+# Parsed episode_data blobs kept for repeated search hits
+EPISODE_CACHE_SIZE = 4096
+
+# Episode fields stored as plain ChromaDB metadata next to the episode_data blob
+METADATA_FIELDS = frozenset({"scenario", "agent_type", "outcome_score", "timestamp"})
+
+# Episode texts (by content hash) and embeddings (by text) reused across writes
+TEXT_CACHE_SIZE = 4096
+EMBEDDING_CACHE_SIZE = 1024
+
+# Dynamic-quantized INT8 export shipped with the sentence-transformers hub models
+ONNX_INT8_FILE = "onnx/model_qint8_avx512_vnni.onnx"
+
+# Texts encoded once after loading so the first real request skips lazy initialization
+WARMUP_BATCH = ["warmup"] * 8
+
+
+def _has_avx512_vnni() -> bool:
+    """Check whether the CPU advertises AVX-512 VNNI (int8 dot product) support"""
+    try:
+        with open("/proc/cpuinfo") as f:
+            return "avx512_vnni" in f.read()
+    except OSError:
+        return False
+
+
+def _dump_episode(episode: Dict[str, Any]) -> str:
+    """Serialize an episode for the ChromaDB metadata blob"""
+    return orjson.dumps(
+        episode,
+        default=str,
+        option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NAIVE_UTC
+    ).decode()
+
+
+def _timestamp_key(value: Any) -> float:
+    """Episode timestamp as epoch seconds for ordering (0.0 when missing or invalid)"""
+    try:
+        if isinstance(value, str):
+            value = datetime.fromisoformat(value)
+        if isinstance(value, datetime):
+            return value.timestamp()
+    except (ValueError, OverflowError, OSError):
+        pass
+    return 0.0
+
+
+@functools.lru_cache(maxsize=EPISODE_CACHE_SIZE)
+def _parse_episode(blob: str) -> Dict[str, Any]:
+    """Parse an episode_data blob (cached; callers must copy before mutating)"""
+    return orjson.loads(blob)
+
+
+if numba is not None:
+    @numba.njit(parallel=True, fastmath=True, cache=True)
+    def _dot_scores(matrix, query, out):
+        """Row-wise dot products into out, parallel over rows (compiled on first call)"""
+        rows, dim = matrix.shape
+        for i in numba.prange(rows):
+            total = np.float32(0.0)
+            for j in range(dim):
+                total += matrix[i, j] * query[j]
+            out[i] = total
+        return out
+else:
+    _dot_scores = None
+
+
+def _default_device() -> str:
+    """CUDA when PyTorch can see a GPU, otherwise CPU"""
+    if torch is not None and torch.cuda.is_available():
+        return "cuda"
+    return "cpu"
+
+
+def _inference_mode():
+    """torch.inference_mode() when PyTorch is installed (no autograd bookkeeping)"""
+    return torch.inference_mode() if torch is not None else contextlib.nullcontext()
+
+
+@functools.lru_cache(maxsize=4)
+def _load_embedding_model(model_name: str, quantized: bool, device: str = "cpu"):
+    """
+    Load an embedding model once per process, preferring the INT8 ONNX export
+    
+    Every EpisodicMemory (and anything else loading the same model on the same
+    device) shares the returned instance. On CUDA the weights are loaded as FP16.
+    """
+    model = None
+    if quantized:
+        try:
+            model = SentenceTransformer(
+                model_name,
+                backend="onnx",
+                model_kwargs={"file_name": ONNX_INT8_FILE, "provider": "CPUExecutionProvider"}
+            )
+            logger.info(f"Loaded INT8 ONNX embedding model: {model_name}")
+        except Exception as e:
+            logger.warning(f"INT8 ONNX embedding model unavailable: {e} - using PyTorch")
+    
+    if model is None:
+        model_kwargs = {"torch_dtype": torch.float16} if device.startswith("cuda") else None
+        model = SentenceTransformer(model_name, device=device, model_kwargs=model_kwargs)
+    
+    with _inference_mode():
+        model.encode(WARMUP_BATCH, show_progress_bar=False)
+    return model
+
+
+class EmbeddingBatcher:
+    """
+    Micro-batcher for single-text embedding requests
+    
+    Features:
+    - Coalesces concurrent requests into one forward pass
+    - Dispatches after 64 texts or 5 ms, whichever comes first
+    - Runs batches on the encoder thread pool, several in flight at once
+    """
+    
+    def __init__(self, encode_batch, executor: ThreadPoolExecutor,
+                 max_batch: int = EMBEDDING_BATCH_SIZE, max_wait: float = EMBEDDING_BATCH_WAIT):
+        self._encode_batch = encode_batch
+        self._executor = executor
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._collector: Optional[asyncio.Task] = None
+        self._in_flight: set = set()
+    
+    def start(self):
+        """Start collecting requests"""
+        if self._collector is None:
+            self._collector = asyncio.create_task(self._collect())
+    
+    async def embed(self, text: str) -> np.ndarray:
+        """Embed one text as part of the next batch"""
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((text, future))
+        return await future
+    
+    async def _collect(self):
+        """Group queued requests into batches and dispatch them"""
+        loop = asyncio.get_running_loop()
+        
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.max_wait
+            
+            while len(batch) < self.max_batch:
+                try:
+                    batch.append(self._queue.get_nowait())
+                    continue
+                except asyncio.QueueEmpty:
+                    pass
+                
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                await asyncio.sleep(remaining)
+                if self._queue.empty():
+                    break
+            
+            task = asyncio.create_task(self._run_batch(batch))
+            self._in_flight.add(task)
+            task.add_done_callback(self._in_flight.discard)
+    
+    async def _run_batch(self, batch: List[Tuple[str, asyncio.Future]]):
+        """Encode one batch and resolve its futures"""
+        texts = [text for text, _ in batch]
+        try:
+            vectors = await asyncio.get_running_loop().run_in_executor(self._executor, self._encode_batch, texts)
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        
+        for (_, future), vector in zip(batch, vectors):
+            if not future.done():
+                future.set_result(np.asarray(vector, dtype=np.float32))
+    
+    async def stop(self):
+        """Stop collecting and fail requests that were never dispatched"""
+        if self._collector is not None:
+            self._collector.cancel()
+            try:
+                await self._collector
+            except asyncio.CancelledError:
+                pass
+            self._collector = None
+        
+        if self._in_flight:
+            await asyncio.gather(*self._in_flight, return_exceptions=True)
+        
+        while not self._queue.empty():
+            _, future = self._queue.get_nowait()
+            if not future.done():
+                future.set_exception(RuntimeError("Embedding batcher stopped"))
+
 
 class EpisodicMemory:
     """
@@ -33,6 +291,17 @@ class EpisodicMemory:
     - Storage of successful interaction episodes
     - Pattern matching for similar scenarios
     - Learning from past experiences
+    
+    Embeddings are L2-normalized when created, so cosine similarity is a
+    plain dot product for both ChromaDB and the in-memory store. The
+    in-memory ANN index stores them as INT8 by default (``ann_dtype``) and
+    re-ranks its top candidates with FP32 copies; ChromaDB keeps FP32 in
+    its own HNSW index. With
+    ``normalize_embeddings: False`` raw vectors are stored and the exact
+    in-memory search divides by row norms kept alongside the matrix.
+    With ``chroma_onnx_embeddings: True`` ChromaDB embeds documents and
+    queries itself using its bundled ONNX all-MiniLM-L6-v2, and no
+    sentence-transformers model is loaded.
     """
     
     def __init__(self, config: Dict[str, Any]):
@@ -40,15 +309,54 @@ class EpisodicMemory:
         self.embedding_model = None
         self.chroma_client = None
         self.collection = None
+        self._encoder_pool: Optional[ThreadPoolExecutor] = None
+        self._batcher: Optional[EmbeddingBatcher] = None
+        self._normalize = self.config.get("normalize_embeddings", True)
+        self._ann_dtype = self.config.get("ann_dtype", ANN_DTYPE)
+        
+        # ChromaDB computes embeddings itself (documents and query_texts)
+        self._chroma_embeds = False
+        
+        # Retried writes and repeated queries skip text building and the forward pass
+        self._text_cache: LRUCache = LRUCache(maxsize=TEXT_CACHE_SIZE)
+        self._emb_cache: LRUCache = LRUCache(maxsize=EMBEDDING_CACHE_SIZE)
         
     async def initialize(self):
         """Initialize vector database and embedding model"""
+        # Model forward passes release the GIL, so encodes run in parallel off the event loop
+        self._encoder_pool = ThreadPoolExecutor(
+            max_workers=min(4, os.cpu_count() or 1),
+            thread_name_prefix="embed"
+        )
+        
         try:
+            chroma_embeds = (
+                self.config.get("chroma_onnx_embeddings", False)
+                and chromadb is not None
+                and ONNXMiniLM_L6_V2 is not None
+            )
+            
             # Initialize embedding model
-            if SentenceTransformer:
+            if chroma_embeds:
+                logger.info("Using ChromaDB ONNX embedding function (all-MiniLM-L6-v2)")
+            elif SentenceTransformer:
                 model_name = self.config.get("model_name", "all-MiniLM-L6-v2")
-                self.embedding_model = SentenceTransformer(model_name)
-                logger.info(f"Loaded embedding model: {model_name}")
+                device = self.config.get("device") or _default_device()
+                
+                # INT8 only pays off with VNNI; without it quantized GEMM can be slower than FP32
+                quantized = (
+                    device == "cpu"
+                    and self.config.get("quantized", True)
+                    and onnxruntime is not None
+                    and "CPUExecutionProvider" in onnxruntime.get_available_providers()
+                    and _has_avx512_vnni()
+                )
+                self.embedding_model = _load_embedding_model(model_name, quantized, device)
+                
+                # Concurrent query encodes share forward passes
+                self._batcher = EmbeddingBatcher(self._encode_batch_sync, self._encoder_pool)
+                self._batcher.start()
+                logger.info(f"Loaded embedding model: {model_name} on {device}")
             else:
                 logger.warning("sentence-transformers not available - using mock embeddings")
             
@@ -56,37 +364,169 @@ class EpisodicMemory:
             if chromadb:
                 self.chroma_client = chromadb.Client()
                 collection_name = self.config.get("collection_name", "episodic_memory")
+                collection_kwargs = {"embedding_function": ONNXMiniLM_L6_V2()} if chroma_embeds else {}
                 
                 try:
-                    self.collection = self.chroma_client.get_collection(collection_name)
+                    self.collection = self.chroma_client.get_collection(collection_name, **collection_kwargs)
                 except Exception:
-                    # Create collection if it doesn't exist
-                    self.collection = self.chroma_client.create_collection(collection_name)
+                    # Create collection if it doesn't exist; HNSW settings are fixed at creation
+                    self.collection = self.chroma_client.create_collection(
+                        collection_name,
+                        metadata={
+                            "hnsw:space": "cosine",
+                            "hnsw:M": self.config.get("hnsw_m", ANN_CONNECTIVITY),
+                            "hnsw:construction_ef": self.config.get("hnsw_ef_construction", ANN_EXPANSION_ADD),
+                            "hnsw:search_ef": self.config.get("hnsw_ef_search", ANN_EXPANSION_SEARCH)
+                        },
+                        **collection_kwargs
+                    )
                 
+                self._chroma_embeds = chroma_embeds
                 logger.info("ChromaDB collection initialized")
             else:
                 logger.warning("ChromaDB not available - using in-memory fallback")
-                self.memory_store = []
+                self._init_memory_store()
             
         except Exception as e:
             logger.warning(f"Episodic memory initialization error: {e} - using fallback")
             self.embedding_model = None
             self.chroma_client = None
-            self.memory_store = []
+            self._chroma_embeds = False
+            self._init_memory_store()
+    
+    def _init_memory_store(self):
+        """Set up the in-memory fallback store"""
+        # Episode records; row i of the embedding matrix belongs to memory_store[i]
+        self.memory_store = []
+        self._emb_matrix: Optional[np.ndarray] = None
+        self._emb_count = 0
+        
+        # Row norms (only kept for unnormalized embeddings) and a reusable score buffer
+        self._emb_norms: Optional[np.ndarray] = None
+        self._score_buf: Optional[np.ndarray] = None
+        
+        # HNSW index (keyed by row number) when usearch is installed
+        self.ann = None
+    
+    def _append_embeddings(self, embeddings) -> None:
+        """Append embedding rows to the fallback matrix, growing it in chunks"""
+        rows = np.asarray(embeddings, dtype=np.float32)
+        count = self._emb_count + len(rows)
+        
+        if Index is not None:
+            if self.ann is None:
+                self.ann = Index(
+                    ndim=rows.shape[1],
+                    metric="cos",
+                    dtype=self._ann_dtype,
+                    connectivity=self.config.get("hnsw_m", ANN_CONNECTIVITY),
+                    expansion_add=self.config.get("hnsw_ef_construction", ANN_EXPANSION_ADD),
+                    expansion_search=self.config.get("hnsw_ef_search", ANN_EXPANSION_SEARCH)
+                )
+            self.ann.add(np.arange(self._emb_count, count), rows)
+            if self._ann_dtype != "i8":
+                self._emb_count = count
+                return
+        
+        # FP32 rows: the exact-search matrix, or the re-rank copy behind an INT8 index
+        if self._emb_matrix is None or count > len(self._emb_matrix):
+            capacity = self._emb_count + max(len(rows), EMBEDDING_GROWTH_ROWS)
+            matrix = np.empty((capacity, rows.shape[1]), dtype=np.float32)
+            norms = np.empty(capacity, dtype=np.float32)
+            if self._emb_matrix is not None:
+                matrix[:self._emb_count] = self._emb_matrix[:self._emb_count]
+                norms[:self._emb_count] = self._emb_norms[:self._emb_count]
+            self._emb_matrix = matrix
+            self._emb_norms = norms
+            self._score_buf = np.empty(capacity, dtype=np.float32)
+        
+        self._emb_matrix[self._emb_count:count] = rows
+        if not self._normalize:
+            # Norms of the new rows only; existing rows are never recomputed
+            self._emb_norms[self._emb_count:count] = np.linalg.norm(rows, axis=1) + 1e-12
+        self._emb_count = count
     
-    def _create_embedding(self, text: str) -> List[float]:
-        """Create embedding vector from text"""
+    def _encode_sync(self, text: str) -> np.ndarray:
+        """Create an embedding vector from text, unit length unless opted out (blocking)"""
         if self.embedding_model:
-            return self.embedding_model.encode(text).tolist()
+            with _inference_mode():
+                vector = self.embedding_model.encode(text, normalize_embeddings=self._normalize)
         else:
-            # Mock embedding for fallback
-            import hashlib
-            hash_obj = hashlib.md5(text.encode())
-            # Convert hash to pseudo-embedding
-            hash_int = int(hash_obj.hexdigest(), 16)
-            # Create 384-dimensional mock embedding
-            mock_embedding = [(hash_int >> i) % 256 / 255.0 - 0.5 for i in range(384)]
-            return mock_embedding
+            # Mock embedding for fallback: the 384 bits of a 48-byte digest, centred on zero
+            digest = hashlib.blake2b(text.encode(), digest_size=48).digest()
+            vector = np.unpackbits(np.frombuffer(digest, dtype=np.uint8)).astype(np.float32) - 0.5
+        
+        vector = np.asarray(vector, dtype=np.float32)
+        if self._normalize:
+            vector /= np.linalg.norm(vector) + 1e-12
+        return vector
+    
+    async def _encode(self, text: str) -> np.ndarray:
+        """Create a unit-length embedding vector from text without blocking the event loop"""
+        vector = self._emb_cache.get(text)
+        if vector is not None:
+            return vector
+        
+        if self.embedding_model is None:
+            # The mock embedding is cheaper than a thread hand-off
+            vector = self._encode_sync(text)
+        elif self._batcher is not None:
+            vector = await self._batcher.embed(text)
+        else:
+            vector = await asyncio.get_running_loop().run_in_executor(self._encoder_pool, self._encode_sync, text)
+        
+        self._emb_cache[text] = vector
+        return vector
+    
+    def _encode_batch_sync(self, texts: List[str]) -> np.ndarray:
+        """Encode several texts in one forward pass (blocking)"""
+        with _inference_mode():
+            return self.embedding_model.encode(
+                texts,
+                batch_size=EMBEDDING_BATCH_SIZE,
+                convert_to_numpy=True,
+                normalize_embeddings=self._normalize,
+                show_progress_bar=False
+            )
+    
+    async def embed(self, text: str) -> Optional[np.ndarray]:
+        """Embedding of a query text, as used by search_similar (None when ChromaDB embeds queries itself)"""
+        if self._chroma_embeds:
+            return None
+        return await self._encode(text)
+    
+    async def _encode_many(self, texts: List[str]) -> np.ndarray:
+        """Embed a batch of texts, encoding only those not already cached"""
+        vectors = {text: self._emb_cache[text] for text in texts if text in self._emb_cache}
+        missing = [text for text in dict.fromkeys(texts) if text not in vectors]
+        
+        if missing:
+            # Single batched forward pass for the uncached texts
+            if self.embedding_model:
+                encoded = await asyncio.get_running_loop().run_in_executor(
+                    self._encoder_pool, self._encode_batch_sync, missing
+                )
+            else:
+                encoded = [self._encode_sync(text) for text in missing]
+            
+            for text, vector in zip(missing, encoded):
+                vectors[text] = vector
+                self._emb_cache[text] = vector
+        
+        return np.stack([vectors[text] for text in texts])
+    
+    def _episode_text(self, episode: Dict[str, Any]) -> str:
+        """Searchable text for an episode, memoized by a hash of its content"""
+        key = hashlib.blake2b(
+            orjson.dumps(episode, default=str, option=orjson.OPT_SERIALIZE_NUMPY),
+            digest_size=8
+        ).digest()
+        
+        text = self._text_cache.get(key)
+        if text is None:
+            text = self._episode_to_text(episode)
+            self._text_cache[key] = text
+        return text
     
     def _episode_to_text(self, episode: Dict[str, Any]) -> str:
         """Convert episode to searchable text"""
@@ -111,37 +551,47 @@ class EpisodicMemory:
     
     async def store(self, episode_id: str, episode: Dict[str, Any]) -> bool:
         """Store successful episode for learning"""
+        return await self.store_many([(episode_id, episode)])
+    
+    async def store_many(self, items: List[Tuple[str, Dict[str, Any]]]) -> bool:
+        """Store several episodes with one embedding batch and one collection write"""
         try:
-            # Convert episode to searchable text
-            episode_text = self._episode_to_text(episode)
+            episode_ids = [episode_id for episode_id, _ in items]
+            
+            # Convert episodes to searchable text
+            texts = [self._episode_text(episode) for _, episode in items]
             
-            # Create embedding
-            embedding = self._create_embedding(episode_text)
+            # Create embeddings in a single batched forward pass (ChromaDB may embed itself)
+            embeddings = None if self._chroma_embeds else await self._encode_many(texts)
             
             if self.collection:
                 # Store in ChromaDB
                 self.collection.add(
-                    ids=[episode_id],
-                    embeddings=[embedding],
-                    documents=[episode_text],
+                    ids=episode_ids,
+                    embeddings=embeddings,
+                    documents=texts,
                     metadatas=[{
                         "scenario": episode.get("scenario", ""),
                         "agent_type": episode.get("agent_type", ""),
                         "outcome_score": episode.get("outcome_score", 0.0),
                         "timestamp": episode.get("timestamp", datetime.now().isoformat()),
-                        "episode_data": json.dumps(episode, default=str)
-                    }]
+                        # Small separate blob so concept reads skip episode_data
+                        "concepts": orjson.dumps(episode.get("concepts", []), default=str).decode(),
+                        "episode_data": _dump_episode(episode)
+                    } for _, episode in items]
                 )
             else:
                 # Store in memory fallback
-                self.memory_store.append({
-                    "id": episode_id,
-                    "embedding": embedding,
-                    "text": episode_text,
-                    "metadata": episode
-                })
+                self._append_embeddings(embeddings)
+                for episode_id, text, (_, episode) in zip(episode_ids, texts, items):
+                    self.memory_store.append({
+                        "id": episode_id,
+                        "text": text,
+                        "metadata": episode,
+                        "ts": _timestamp_key(episode.get("timestamp"))
+                    })
             
-            logger.info(f"Stored episodic memory: {episode_id}")
+            logger.info(f"Stored {len(items)} episodic memories")
             return True
             
         except Exception as e:
@@ -152,13 +602,18 @@ class EpisodicMemory:
         self, 
         query_text: str, 
         filters: Optional[Dict[str, Any]] = None,
-        limit: int = 5
+        limit: int = 5,
+        fields: Optional[Set[str]] = None
     ) -> List[Dict[str, Any]]:
-        """Search for similar episodes"""
+        """
+        Search for similar episodes
+        
+        Returns full episodes by default. With ``fields``, each hit carries only
+        those episode keys plus ``similarity_score``; when every field is a plain
+        metadata column (scenario, agent_type, outcome_score, timestamp) the
+        episode_data blob is not parsed at all.
+        """
         try:
-            # Create query embedding
-            query_embedding = self._create_embedding(query_text)
-            
             if self.collection:
                 # Search in ChromaDB
                 where_clause = {}
@@ -167,17 +622,31 @@ class EpisodicMemory:
                         if key in ["scenario", "agent_type"]:
                             where_clause[key] = value
                 
+                if self._chroma_embeds:
+                    query = {"query_texts": [query_text]}
+                else:
+                    query_embedding = await self._encode(query_text)
+                    query = {"query_embeddings": query_embedding.reshape(1, -1)}
+                
                 results = self.collection.query(
-                    query_embeddings=[query_embedding],
+                    **query,
                     n_results=limit,
-                    where=where_clause if where_clause else None
+                    where=where_clause if where_clause else None,
+                    include=["metadatas", "distances"]
                 )
                 
+                # Only parse the blob when a requested field lives inside it
+                needs_blob = fields is None or not fields <= METADATA_FIELDS
+                
                 # Parse results
                 similar_episodes = []
                 if results and results["metadatas"]:
                     for i, metadata in enumerate(results["metadatas"][0]):
-                        episode_data = json.loads(metadata.get("episode_data", "{}"))
+                        if needs_blob:
+                            episode_data = _parse_episode(metadata.get("episode_data", "{}"))
+                        else:
+                            episode_data = metadata
+                        episode_data = self._project(episode_data, fields)
                         episode_data["similarity_score"] = 1.0 - (results["distances"][0][i] if results["distances"] else 0.0)
                         similar_episodes.append(episode_data)
                 
@@ -185,75 +654,172 @@ class EpisodicMemory:
             
             else:
                 # Search in memory fallback
-                def cosine_similarity(a, b):
-                    dot_product = sum(x * y for x, y in zip(a, b))
-                    magnitude_a = sum(x * x for x in a) ** 0.5
-                    magnitude_b = sum(x * x for x in b) ** 0.5
-                    if magnitude_a == 0 or magnitude_b == 0:
-                        return 0
-                    return dot_product / (magnitude_a * magnitude_b)
-                
-                # Calculate similarities
-                similarities = []
-                for stored in self.memory_store:
-                    similarity = cosine_similarity(query_embedding, stored["embedding"])
-                    
-                    # Apply filters
-                    if filters:
-                        metadata = stored["metadata"]
-                        if not all(metadata.get(k) == v for k, v in filters.items() if k in metadata):
-                            continue
-                    
-                    similarities.append({
-                        **stored["metadata"],
-                        "similarity_score": similarity
-                    })
-                
-                # Sort by similarity and return top results
-                similarities.sort(key=lambda x: x["similarity_score"], reverse=True)
-                return similarities[:limit]
+                query_embedding = await self._encode(query_text)
+                return self._search_memory_store(query_embedding, filters, limit, fields)
             
         except Exception as e:
             logger.error(f"Error searching episodic memory: {e}")
             return []
     
+    @staticmethod
+    def _matches_filters(metadata: Dict[str, Any], filters: Dict[str, Any]) -> bool:
+        """Check episode metadata against search filters (missing keys pass)"""
+        return all(metadata.get(k) == v for k, v in filters.items() if k in metadata)
+    
+    @staticmethod
+    def _project(episode: Dict[str, Any], fields: Optional[Set[str]]) -> Dict[str, Any]:
+        """Copy an episode, keeping only the requested fields when given"""
+        if fields is None:
+            return dict(episode)
+        return {k: episode[k] for k in fields if k in episode}
+    
+    def _search_memory_store(
+        self,
+        query_embedding: np.ndarray,
+        filters: Optional[Dict[str, Any]],
+        limit: int,
+        fields: Optional[Set[str]] = None
+    ) -> List[Dict[str, Any]]:
+        """Search the in-memory fallback store"""
+        count = self._emb_count
+        if count == 0 or limit <= 0:
+            return []
+        
+        if self.ann is not None:
+            # Approximate nearest neighbours from the HNSW index
+            fetch = limit * ANN_FILTER_OVERFETCH if filters else limit
+            rerank = self._ann_dtype == "i8"
+            if rerank:
+                fetch = max(fetch, ANN_RERANK_CANDIDATES)
+            matches = self.ann.search(query_embedding, min(count, fetch))
+            
+            keys = np.asarray(matches.keys, dtype=np.int64)
+            if rerank:
+                # Exact FP32 cosine for the few INT8 candidates
+                similarities = self._emb_matrix[keys] @ query_embedding
+                if not self._normalize:
+                    similarities /= self._emb_norms[keys] * (np.linalg.norm(query_embedding) + 1e-12)
+                order = np.argsort(-similarities, kind="stable")
+                keys = keys[order]
+                similarities = similarities[order]
+            else:
+                similarities = 1.0 - np.asarray(matches.distances, dtype=np.float32)
+            
+            results = []
+            for key, similarity in zip(keys, similarities):
+                metadata = self.memory_store[int(key)]["metadata"]
+                if filters and not self._matches_filters(metadata, filters):
+                    continue
+                results.append({**self._project(metadata, fields), "similarity_score": float(similarity)})
+                if len(results) == limit:
+                    break
+            return results
+        
+        # Exact search: with unit-length vectors the dot product is the cosine
+        scores = self._score_buf[:count]
+        if _dot_scores is not None:
+            _dot_scores(self._emb_matrix[:count], query_embedding, scores)
+        else:
+            np.matmul(self._emb_matrix[:count], query_embedding, out=scores)
+        
+        if not self._normalize:
+            scores /= self._emb_norms[:count]
+            scores /= np.linalg.norm(query_embedding) + 1e-12
+        
+        # Apply filters
+        candidates = count
+        if filters:
+            keep = np.fromiter(
+                (self._matches_filters(stored["metadata"], filters) for stored in self.memory_store),
+                dtype=bool,
+                count=count
+            )
+            scores[~keep] = -np.inf
+            candidates = int(keep.sum())
+        
+        # Select the top results without sorting every episode
+        top_k = min(limit, candidates)
+        if top_k <= 0:
+            return []
+        if top_k < count:
+            top = np.argpartition(-scores, top_k - 1)[:top_k]
+        else:
+            top = np.arange(count)
+        top = top[np.argsort(-scores[top], kind="stable")]
+        
+        return [
+            {**self._project(self.memory_store[i]["metadata"], fields), "similarity_score": float(scores[i])}
+            for i in top
+        ]
+    
+    def _recent_successful(self, limit: int) -> List[Dict[str, Any]]:
+        """Metadata (ChromaDB) or episodes (fallback) of recent successes, most recent first"""
+        if self.collection:
+            # Metadata-only scan; no similarity ranking is needed here. get() with
+            # a limit returns the first matches in storage order, not the newest,
+            # so every match is fetched and the newest are picked below
+            results = self.collection.get(
+                where={"outcome_score": {"$gte": 0.7}},  # High success threshold
+                include=["metadatas"]
+            )
+            
+            metadatas = (results or {}).get("metadatas") or []
+            
+            # Most recent first
+            return heapq.nlargest(limit, metadatas, key=lambda x: x.get("timestamp", ""))
+        
+        # Filter memory store for successful episodes
+        successful = (
+            stored for stored in self.memory_store
+            if stored["metadata"].get("outcome_score", 0) >= 0.7
+        )
+        
+        # Most recent first, keeping only `limit` entries in the heap
+        recent = heapq.nlargest(limit, successful, key=lambda x: x["ts"])
+        return [stored["metadata"] for stored in recent]
+    
     async def get_recent_successes(self, limit: int = 50) -> List[Dict[str, Any]]:
         """Get recent successful episodes for learning"""
         try:
+            recent = self._recent_successful(limit)
             if self.collection:
-                # Query ChromaDB for recent high-scoring episodes
-                results = self.collection.query(
-                    query_embeddings=[self._create_embedding("successful interaction")],
-                    n_results=limit,
-                    where={"outcome_score": {"$gte": 0.7}}  # High success threshold
-                )
-                
-                episodes = []
-                if results and results["metadatas"]:
-                    for metadata in results["metadatas"][0]:
-                        episode_data = json.loads(metadata.get("episode_data", "{}"))
-                        episodes.append(episode_data)
-                
-                return episodes
-            else:
-                # Filter memory store for successful episodes
-                successful = [
-                    stored["metadata"] for stored in self.memory_store
-                    if stored["metadata"].get("outcome_score", 0) >= 0.7
-                ]
-                
-                # Sort by timestamp (recent first)
-                successful.sort(
-                    key=lambda x: x.get("timestamp", ""), 
-                    reverse=True
-                )
-                
-                return successful[:limit]
+                return [dict(_parse_episode(metadata.get("episode_data", "{}"))) for metadata in recent]
+            return recent
             
         except Exception as e:
             logger.error(f"Error getting recent successes: {e}")
             return []
     
+    async def get_recent_concepts(self, limit: int = 50) -> List[Dict[str, Any]]:
+        """
+        Get the concepts and outcome_score of recent successful episodes
+        
+        Reads only the concepts extracted when each episode was stored; the
+        episode_data blob is never parsed. Episodes stored without concepts
+        yield an empty list.
+        """
+        try:
+            recent = self._recent_successful(limit)
+            if self.collection:
+                return [
+                    {
+                        "outcome_score": metadata.get("outcome_score", 0.5),
+                        "concepts": orjson.loads(metadata.get("concepts") or "[]")
+                    }
+                    for metadata in recent
+                ]
+            return [
+                {
+                    "outcome_score": episode.get("outcome_score", 0.5),
+                    "concepts": episode.get("concepts", [])
+                }
+                for episode in recent
+            ]
+            
+        except Exception as e:
+            logger.error(f"Error getting recent concepts: {e}")
+            return []
+    
     async def get_status(self) -> Dict[str, Any]:
         """Get episodic memory status"""
         try:
@@ -284,4 +850,10 @@ class EpisodicMemory:
         """Cleanup resources"""
         # ChromaDB client doesn't need explicit cleanup
         # Embedding model is handled by garbage collection
-        pass
+        if self._batcher is not None:
+            await self._batcher.stop()
+            self._batcher = None
+        
+        if self._encoder_pool is not None:
+            self._encoder_pool.shutdown(wait=False)
+            self._encoder_pool = None
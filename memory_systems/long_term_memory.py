@@ -5,19 +5,164 @@ PostgreSQL-based implementation for customer profiles, preferences, and interact
 Provides persistent storage with complex query capabilities.
 """
 
-import json
 import asyncio
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Sequence
 from datetime import datetime
 import logging
 
+import msgspec
+import orjson
+
 try:
     import asyncpg
 except ImportError:
     asyncpg = None
 
+try:
+    from ciso8601 import parse_datetime
+except ImportError:
+    parse_datetime = datetime.fromisoformat
+
 logger = logging.getLogger(__name__)
 
+# Version header of the PostgreSQL binary JSONB wire format
+JSONB_BINARY_VERSION = b"\x01"
+
+
+def _encode_jsonb(value: Any) -> bytes:
+    """Encode a Python value as binary JSONB"""
+    return JSONB_BINARY_VERSION + orjson.dumps(value, default=str)
+
+
+def _decode_jsonb(data: bytes) -> Any:
+    """Decode binary JSONB into a Python value"""
+    return orjson.loads(data[1:])
+
+
+def _pack_default(value: Any) -> Any:
+    """Fallback for values msgpack cannot encode (NumPy values become lists/numbers)"""
+    tolist = getattr(value, "tolist", None)
+    return tolist() if tolist is not None else str(value)
+
+
+# Action and handoff payloads are write-mostly, so they are stored as MessagePack
+# BYTEA (read back with msgspec.msgpack.decode) instead of being parsed into JSONB
+_payload_encoder = msgspec.msgpack.Encoder(enc_hook=_pack_default)
+
+# Payload columns created as JSONB by earlier versions. They are converted in
+# place to BYTEA; converted rows keep their JSON as UTF-8 text, which starts
+# with '{' and so cannot be mistaken for a MessagePack map
+PAYLOAD_COLUMNS = {
+    "agent_actions_log": ["context", "result"],
+    "handoff_context_log": ["context_data"],
+}
+
+
+# Write statements prepared once per pool connection
+UPSERT_PROFILE_SQL = """
+    WITH cleared AS (
+        -- The supplied history replaces any events appended since the last full store
+        DELETE FROM interaction_events WHERE lead_id = $1
+    )
+    INSERT INTO customer_profiles (lead_id, preferences, interaction_history, rfm_score, last_updated)
+    VALUES ($1, $2, $3, $4, CURRENT_TIMESTAMP)
+    ON CONFLICT (lead_id) DO UPDATE SET
+        preferences = $2,
+        interaction_history = $3,
+        rfm_score = $4,
+        last_updated = CURRENT_TIMESTAMP
+"""
+
+# Inserts one event row instead of rewriting the profile's history. RFM is
+# derived from the event count and latest event time (the CTE's own insert is
+# not visible to the history scan, hence the +1 and GREATEST).
+APPEND_INTERACTION_SQL = """
+    WITH event AS (
+        INSERT INTO interaction_events (lead_id, record, created_at)
+        SELECT lead_id, $2::jsonb, COALESCE($5::timestamp, LOCALTIMESTAMP)
+        FROM customer_profiles WHERE lead_id = $1
+        RETURNING lead_id, created_at
+    ), history AS (
+        SELECT COUNT(*) AS appended, MAX(created_at) AS latest
+        FROM interaction_events WHERE lead_id = $1
+    )
+    UPDATE customer_profiles p SET
+        preferences = p.preferences || $3::jsonb,
+        rfm_score = COALESCE($4, ROUND((
+            GREATEST(0, 1 - FLOOR(EXTRACT(EPOCH FROM LOCALTIMESTAMP - GREATEST(history.latest, event.created_at)) / 86400) / 30)
+            + LEAST(1.0, (jsonb_array_length(p.interaction_history) + history.appended + 1) / 10.0)
+            + 0.5
+        ) / 3, 3)),
+        last_updated = CURRENT_TIMESTAMP
+    FROM event, history
+    WHERE p.lead_id = event.lead_id
+    RETURNING p.lead_id
+"""
+
+# Row-by-row fallback when a COPY batch is rejected (e.g. a duplicate action_id)
+INSERT_ACTION_SQL = """
+    INSERT INTO agent_actions_log
+    (action_id, agent_type, action_type, timestamp, context, result, handoff_target)
+    VALUES ($1, $2, $3, $4, $5, $6, $7)
+    ON CONFLICT (action_id) DO NOTHING
+"""
+
+INSERT_HANDOFF_SQL = """
+    INSERT INTO handoff_context_log
+    (conversation_id, lead_id, source_agent, target_agent, context_data, handoff_reason, timestamp)
+    VALUES ($1, $2, $3, $4, $5, $6, COALESCE($7::timestamp, LOCALTIMESTAMP))
+"""
+
+# customer_profiles columns and how each is returned from get()
+PROFILE_COLUMNS = {
+    "lead_id": lambda v: v,
+    "preferences": lambda v: v or {},
+    "interaction_history": lambda v: v or [],
+    "rfm_score": lambda v: float(v) if v else 0.0,
+    "created_at": lambda v: v.isoformat() if v else None,
+    "last_updated": lambda v: v.isoformat() if v else None,
+}
+
+# Select expressions for columns not read verbatim: the profile's history is the
+# stored document followed by the events appended since
+PROFILE_SELECT = {
+    "interaction_history": """interaction_history || COALESCE((
+        SELECT jsonb_agg(e.record ORDER BY e.created_at, e.event_id)
+        FROM interaction_events e WHERE e.lead_id = customer_profiles.lead_id
+    ), '[]') AS interaction_history""",
+}
+
+# Agent action rows are buffered and written in batches with COPY
+ACTION_LOG_COLUMNS = [
+    "action_id", "agent_type", "action_type", "timestamp",
+    "context", "result", "handoff_target"
+]
+ACTION_QUEUE_SIZE = 10000
+ACTION_FLUSH_ROWS = 500
+ACTION_FLUSH_INTERVAL = 0.05  # seconds
+
+
+def _rfm_score(interaction_count: int, latest: datetime) -> float:
+    """RFM score as computed by APPEND_INTERACTION_SQL (used by the in-memory fallback)"""
+    days_since = (datetime.now() - latest).days
+    recency_score = max(0, 1 - (days_since / 30))
+    frequency_score = min(1.0, interaction_count / 10)
+    return round((recency_score + frequency_score + 0.5) / 3, 3)
+
+
+if asyncpg is not None:
+    class _PreparedConnection(asyncpg.Connection):
+        """Pool connection that keeps its prepared write statements"""
+        __slots__ = ("prepared_statements",)
+        
+        async def prepared(self, sql: str):
+            """Return the prepared statement for sql, preparing it on first use"""
+            stmt = self.prepared_statements.get(sql)
+            if stmt is None:
+                stmt = await self.prepare(sql)
+                self.prepared_statements[sql] = stmt
+            return stmt
+
 
 class LongTermMemory:
     """
@@ -28,12 +173,17 @@ class LongTermMemory:
     - Complex queries and analytics
     - JSONB support for flexible schemas
     - Connection pooling for performance
+    - Batched action log writes
     """
     
     def __init__(self, config: Dict[str, Any]):
         self.config = config
         self.connection_pool = None
         
+        # Pending agent_actions_log rows; None is the shutdown sentinel
+        self._action_queue: asyncio.Queue[Optional[tuple]] = asyncio.Queue(maxsize=ACTION_QUEUE_SIZE)
+        self._flusher: Optional[asyncio.Task] = None
+        
     async def initialize(self):
         """Initialize PostgreSQL connection pool"""
         if asyncpg is None:
@@ -49,13 +199,25 @@ class LongTermMemory:
                 database=self.config.get("database", "marketing_agents"),
                 user=self.config.get("user", "postgres"),
                 password=self.config.get("password", "password"),
-                min_size=5,
-                max_size=20
+                min_size=self.config.get("min_size", 5),
+                max_size=self.config.get("max_size", 20),
+                init=self._init_connection,
+                connection_class=_PreparedConnection,
+                statement_cache_size=1024,
+                max_inactive_connection_lifetime=300,
+                command_timeout=self.config.get("command_timeout", 30),
+                server_settings={
+                    # JIT compilation only adds latency to these short OLTP statements
+                    "jit": "off",
+                    "application_name": "mktg-agent"
+                }
             )
             
             # Create tables if they don't exist
             await self._create_tables()
             
+            self._flusher = asyncio.create_task(self._flush_actions())
+            
             logger.info("Long-term memory (PostgreSQL) initialized successfully")
             
         except Exception as e:
@@ -63,6 +225,19 @@ class LongTermMemory:
             self.connection_pool = None
             self.memory_store = {}
     
+    @staticmethod
+    async def _init_connection(conn):
+        """Register orjson-backed JSONB codecs on a new pool connection"""
+        # Statements are prepared lazily since the tables may not exist yet
+        conn.prepared_statements = {}
+        await conn.set_type_codec(
+            "jsonb",
+            encoder=_encode_jsonb,
+            decoder=_decode_jsonb,
+            schema="pg_catalog",
+            format="binary"
+        )
+    
     async def _create_tables(self):
         """Create necessary tables"""
         if not self.connection_pool:
@@ -81,6 +256,16 @@ class LongTermMemory:
                 )
             """)
             
+            # Append-only interaction events, folded into the profile history on read
+            await conn.execute("""
+                CREATE TABLE IF NOT EXISTS interaction_events (
+                    event_id BIGSERIAL PRIMARY KEY,
+                    lead_id VARCHAR(255) NOT NULL,
+                    record JSONB NOT NULL,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            """)
+            
             # Agent actions log
             await conn.execute("""
                 CREATE TABLE IF NOT EXISTS agent_actions_log (
@@ -88,8 +273,8 @@ class LongTermMemory:
                     agent_type VARCHAR(100),
                     action_type VARCHAR(100),
                     timestamp TIMESTAMP,
-                    context JSONB,
-                    result JSONB,
+                    context BYTEA,
+                    result BYTEA,
                     handoff_target VARCHAR(100)
                 )
             """)
@@ -101,36 +286,57 @@ class LongTermMemory:
                     lead_id VARCHAR(255),
                     source_agent VARCHAR(100),
                     target_agent VARCHAR(100),
-                    context_data JSONB,
+                    context_data BYTEA,
                     handoff_reason TEXT,
                     timestamp TIMESTAMP
                 )
             """)
             
+            await self._migrate_payload_columns(conn)
+            
             # Create indexes
             await conn.execute("CREATE INDEX IF NOT EXISTS idx_customer_rfm ON customer_profiles (rfm_score DESC)")
             await conn.execute("CREATE INDEX IF NOT EXISTS idx_customer_preferences ON customer_profiles USING GIN (preferences)")
             await conn.execute("CREATE INDEX IF NOT EXISTS idx_actions_agent ON agent_actions_log (agent_type, action_type)")
+            await conn.execute("CREATE INDEX IF NOT EXISTS idx_events_lead ON interaction_events (lead_id, created_at)")
+            
+            # Covering index so RFM lookups never read the TOASTed JSONB columns
+            await conn.execute("CREATE INDEX IF NOT EXISTS idx_customer_core ON customer_profiles (lead_id) INCLUDE (rfm_score, last_updated)")
+    
+    @staticmethod
+    async def _migrate_payload_columns(conn):
+        """Convert payload columns still typed JSONB to BYTEA"""
+        rows = await conn.fetch(
+            """
+            SELECT table_name, column_name FROM information_schema.columns
+            WHERE table_schema = current_schema()
+              AND table_name = ANY($1::text[])
+              AND data_type = 'jsonb'
+            """,
+            list(PAYLOAD_COLUMNS)
+        )
+        
+        for row in rows:
+            table, column = row["table_name"], row["column_name"]
+            if column not in PAYLOAD_COLUMNS[table]:
+                continue
+            logger.info(f"Migrating {table}.{column} from JSONB to BYTEA")
+            await conn.execute(
+                f"ALTER TABLE {table} ALTER COLUMN {column} "
+                f"TYPE BYTEA USING convert_to({column}::text, 'UTF8')"
+            )
     
     async def store(self, lead_id: str, data: Dict[str, Any]) -> bool:
         """Store customer profile data"""
         try:
             if self.connection_pool:
                 async with self.connection_pool.acquire() as conn:
-                    await conn.execute("""
-                        INSERT INTO customer_profiles (lead_id, preferences, interaction_history, rfm_score, last_updated)
-                        VALUES ($1, $2, $3, $4, $5)
-                        ON CONFLICT (lead_id) DO UPDATE SET
-                            preferences = $2,
-                            interaction_history = $3,
-                            rfm_score = $4,
-                            last_updated = $5
-                    """, 
+                    stmt = await conn.prepared(UPSERT_PROFILE_SQL)
+                    await stmt.fetch(
                     lead_id,
-                    json.dumps(data.get("preferences", {})),
-                    json.dumps(data.get("interaction_history", [])),
-                    data.get("rfm_score", 0.0),
-                    datetime.now()
+                    data.get("preferences", {}),
+                    data.get("interaction_history", []),
+                    data.get("rfm_score", 0.0)
                     )
             else:
                 # In-memory fallback
@@ -142,28 +348,74 @@ class LongTermMemory:
             logger.error(f"Error storing long-term memory: {e}")
             return False
     
-    async def get(self, lead_id: str) -> Optional[Dict[str, Any]]:
-        """Retrieve customer profile data"""
+    async def append_interaction(
+        self,
+        lead_id: str,
+        event: Dict[str, Any],
+        preferences: Optional[Dict[str, Any]] = None,
+        rfm_score: Optional[float] = None
+    ) -> bool:
+        """
+        Append one interaction to an existing profile, merging preferences
+        
+        Unless rfm_score is given, the score is recomputed from the number of
+        interactions and the time of the latest one.
+        """
+        try:
+            event_time = parse_datetime(event["timestamp"]) if event.get("timestamp") else None
+            
+            if self.connection_pool:
+                async with self.connection_pool.acquire() as conn:
+                    stmt = await conn.prepared(APPEND_INTERACTION_SQL)
+                    updated = await stmt.fetchval(lead_id, event, preferences or {}, rfm_score, event_time)
+                return updated is not None
+            
+            # In-memory fallback
+            profile = self.memory_store.get(lead_id)
+            if profile is None:
+                return False
+            history = profile.setdefault("interaction_history", [])
+            history.append(event)
+            profile.setdefault("preferences", {}).update(preferences or {})
+            if rfm_score is None:
+                rfm_score = _rfm_score(len(history), event_time or datetime.now())
+            profile["rfm_score"] = rfm_score
+            profile["last_updated"] = datetime.now().isoformat()
+            return True
+            
+        except Exception as e:
+            logger.error(f"Error appending interaction: {e}")
+            return False
+    
+    async def get(self, lead_id: str, fields: Optional[Sequence[str]] = None) -> Optional[Dict[str, Any]]:
+        """Retrieve customer profile data (only lead_id plus ``fields`` when given)"""
         try:
+            if fields is not None:
+                unknown = set(fields) - PROFILE_COLUMNS.keys()
+                if unknown:
+                    raise ValueError(f"Unknown profile fields: {sorted(unknown)}")
+            
             if self.connection_pool:
+                if fields is None:
+                    columns = list(PROFILE_COLUMNS)
+                else:
+                    columns = ["lead_id", *(f for f in fields if f != "lead_id")]
+                select_list = ", ".join(PROFILE_SELECT.get(column, column) for column in columns)
+                
                 async with self.connection_pool.acquire() as conn:
                     row = await conn.fetchrow(
-                        "SELECT * FROM customer_profiles WHERE lead_id = $1",
+                        f"SELECT {select_list} FROM customer_profiles WHERE lead_id = $1",
                         lead_id
                     )
                     
                     if row:
-                        return {
-                            "lead_id": row["lead_id"],
-                            "preferences": json.loads(row["preferences"]) if row["preferences"] else {},
-                            "interaction_history": json.loads(row["interaction_history"]) if row["interaction_history"] else [],
-                            "rfm_score": float(row["rfm_score"]) if row["rfm_score"] else 0.0,
-                            "created_at": row["created_at"].isoformat() if row["created_at"] else None,
-                            "last_updated": row["last_updated"].isoformat() if row["last_updated"] else None
-                        }
+                        return {column: PROFILE_COLUMNS[column](row[column]) for column in columns}
             else:
                 # In-memory fallback
-                return self.memory_store.get(lead_id)
+                profile = self.memory_store.get(lead_id)
+                if profile is None or fields is None:
+                    return profile
+                return {field: profile[field] for field in fields if field in profile}
             
             return None
             
@@ -186,47 +438,113 @@ class LongTermMemory:
             return None
     
     async def log_action(self, action_data: Dict[str, Any]) -> bool:
-        """Log agent action for analysis"""
+        """
+        Queue agent action for analysis (written in batches)
+        
+        Returns True once the action is queued; it is written to the database
+        by the background flusher, so True does not mean the row is stored.
+        """
         try:
             if self.connection_pool:
-                async with self.connection_pool.acquire() as conn:
-                    await conn.execute("""
-                        INSERT INTO agent_actions_log 
-                        (action_id, agent_type, action_type, timestamp, context, result, handoff_target)
-                        VALUES ($1, $2, $3, $4, $5, $6, $7)
-                    """,
+                self._action_queue.put_nowait((
                     action_data.get("action_id"),
                     action_data.get("agent_type"),
                     action_data.get("action_type"),
-                    datetime.fromisoformat(action_data.get("timestamp")) if action_data.get("timestamp") else datetime.now(),
-                    json.dumps(action_data.get("context", {})),
-                    json.dumps(action_data.get("result", {})),
+                    # COPY cannot fall back to a column default, so stamp missing times here
+                    parse_datetime(action_data["timestamp"]) if action_data.get("timestamp") else datetime.now(),
+                    _payload_encoder.encode(action_data.get("context", {})),
+                    _payload_encoder.encode(action_data.get("result", {})),
                     action_data.get("handoff_target")
-                    )
+                ))
             
             return True
             
+        except asyncio.QueueFull:
+            logger.warning("Action log queue full - dropping action")
+            return False
         except Exception as e:
             logger.error(f"Error logging action: {e}")
             return False
     
+    async def _flush_actions(self):
+        """Write queued actions in batches of up to 500 rows or every 50 ms"""
+        loop = asyncio.get_running_loop()
+        
+        while True:
+            rows = []
+            stopping = False
+            deadline = loop.time() + ACTION_FLUSH_INTERVAL
+            
+            row = await self._action_queue.get()
+            while True:
+                if row is None:
+                    stopping = True
+                    break
+                rows.append(row)
+                if len(rows) >= ACTION_FLUSH_ROWS:
+                    break
+                
+                try:
+                    row = self._action_queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    # Give the batch until the deadline to fill up
+                    remaining = deadline - loop.time()
+                    if remaining <= 0:
+                        break
+                    await asyncio.sleep(remaining)
+                    try:
+                        row = self._action_queue.get_nowait()
+                    except asyncio.QueueEmpty:
+                        break
+            
+            if rows:
+                await self._write_actions(rows)
+            
+            if stopping:
+                return
+    
+    async def _write_actions(self, rows: List[tuple]):
+        """Copy a batch of action rows into agent_actions_log"""
+        try:
+            async with self.connection_pool.acquire() as conn:
+                try:
+                    await conn.copy_records_to_table(
+                        "agent_actions_log",
+                        records=rows,
+                        columns=ACTION_LOG_COLUMNS
+                    )
+                    return
+                except Exception as e:
+                    logger.warning(f"COPY of {len(rows)} logged actions failed: {e} - inserting row by row")
+                
+                # A single bad row rejects the whole COPY, so only that row is lost here
+                stmt = await conn.prepared(INSERT_ACTION_SQL)
+                failed = 0
+                for row in rows:
+                    try:
+                        await stmt.fetch(*row)
+                    except Exception as e:
+                        failed += 1
+                        logger.error(f"Error writing logged action {row[0]}: {e}")
+                if failed:
+                    logger.error(f"Dropped {failed} of {len(rows)} logged actions")
+        except Exception as e:
+            logger.error(f"Error writing {len(rows)} logged actions: {e}")
+    
     async def store_handoff(self, handoff_data: Dict[str, Any]) -> bool:
         """Store handoff context for analysis"""
         try:
             if self.connection_pool:
                 async with self.connection_pool.acquire() as conn:
-                    await conn.execute("""
-                        INSERT INTO handoff_context_log 
-                        (conversation_id, lead_id, source_agent, target_agent, context_data, handoff_reason, timestamp)
-                        VALUES ($1, $2, $3, $4, $5, $6, $7)
-                    """,
+                    stmt = await conn.prepared(INSERT_HANDOFF_SQL)
+                    await stmt.fetch(
                     handoff_data.get("conversation_id"),
                     handoff_data.get("lead_id"),
                     handoff_data.get("source_agent"),
                     handoff_data.get("target_agent"),
-                    json.dumps(handoff_data.get("context_data", {})),
+                    _payload_encoder.encode(handoff_data.get("context_data", {})),
                     handoff_data.get("handoff_reason"),
-                    datetime.fromisoformat(handoff_data.get("timestamp")) if handoff_data.get("timestamp") else datetime.now()
+                    parse_datetime(handoff_data["timestamp"]) if handoff_data.get("timestamp") else None
                     )
             
             return True
@@ -296,5 +614,11 @@ class LongTermMemory:
     
     async def cleanup(self):
         """Cleanup connections"""
+        if self._flusher is not None:
+            # Write out whatever is still queued before closing the pool
+            await self._action_queue.put(None)
+            await self._flusher
+            self._flusher = None
+        
         if self.connection_pool:
             await self.connection_pool.close()
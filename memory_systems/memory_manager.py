@@ -9,12 +9,15 @@ Manages the four-tier adaptive memory architecture:
 """
 
 from typing import Dict, Any, List, Optional
-import json
 import asyncio
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 import logging
 import uuid
 
+import numpy as np
+import orjson
+from cachetools import TTLCache
+
 # Database connections
 import redis.asyncio as redis
 import asyncpg
@@ -25,10 +28,18 @@ from .short_term_memory import ShortTermMemory
 from .long_term_memory import LongTermMemory  
 from .episodic_memory import EpisodicMemory
 from .semantic_memory import SemanticMemory
+from .query_cache import QueryCache
 
 
 logger = logging.getLogger(__name__)
 
+# Long-term profiles are served from process memory for this long after a read
+LONG_TERM_CACHE_TTL = 60  # seconds
+LONG_TERM_CACHE_SIZE = 10000
+
+# Histories at least this long are scored with vectorized NumPy date parsing
+RFM_VECTORIZE_MIN_HISTORY = 100
+
 
 class MemoryManager:
     """
@@ -57,6 +68,18 @@ class MemoryManager:
             "semantic_relationship_threshold": 0.7  # Similarity threshold
         }
         
+        # Near-duplicate episodic queries reuse earlier results
+        cache_config = self.config.get("episodic_cache", {})
+        self._episodic_cache = QueryCache(
+            threshold=cache_config.get("threshold", 0.95),
+            max_entries=cache_config.get("max_entries", 10000)
+        )
+        
+        # Hot leads skip the Postgres round-trip; writes through this manager invalidate
+        self._long_term_cache: TTLCache = TTLCache(maxsize=LONG_TERM_CACHE_SIZE, ttl=LONG_TERM_CACHE_TTL)
+        # Long-term write counter (all leads); a read only caches if no write ran meanwhile
+        self._long_term_generation = 0
+        
         self.initialized = False
     
     def _get_default_config(self) -> Dict[str, Any]:
@@ -73,7 +96,10 @@ class MemoryManager:
                 "port": 5432,
                 "database": "marketing_agents",
                 "user": "postgres",
-                "password": "password"
+                "password": "password",
+                "min_size": 10,
+                "max_size": 50,
+                "command_timeout": 60
             },
             "vector_db": {
                 "model_name": "all-MiniLM-L6-v2",
@@ -83,7 +109,8 @@ class MemoryManager:
             "neo4j": {
                 "uri": "bolt://localhost:7687",
                 "user": "neo4j",
-                "password": "password"
+                "password": "password",
+                "database": "neo4j"
             }
         }
     
@@ -95,11 +122,13 @@ class MemoryManager:
         logger.info("Initializing memory manager...")
         
         try:
-            # Initialize each memory subsystem
-            await self.short_term.initialize()
-            await self.long_term.initialize()
-            await self.episodic.initialize()
-            await self.semantic.initialize()
+            # Initialize each memory subsystem; they are independent, so connect concurrently
+            await asyncio.gather(
+                self.short_term.initialize(),
+                self.long_term.initialize(),
+                self.episodic.initialize(),
+                self.semantic.initialize()
+            )
             
             self.initialized = True
             logger.info("Memory manager initialized successfully")
@@ -110,10 +139,12 @@ class MemoryManager:
     
     async def cleanup(self):
         """Cleanup memory connections"""
-        await self.short_term.cleanup()
-        await self.long_term.cleanup()
-        await self.episodic.cleanup()
-        await self.semantic.cleanup()
+        await asyncio.gather(
+            self.short_term.cleanup(),
+            self.long_term.cleanup(),
+            self.episodic.cleanup(),
+            self.semantic.cleanup()
+        )
     
     # Short-term memory methods
     async def store_short_term(
@@ -129,26 +160,23 @@ class MemoryManager:
             "conversation_id": conversation_id,
             "lead_id": lead_id,
             "context": context,
-            "last_updated": datetime.now().isoformat(),
-            "interaction_count": 1
+            "last_updated": datetime.now().isoformat()
         }
         
-        # Get existing data to increment interaction count
-        existing = await self.short_term.get(conversation_id)
-        if existing:
-            memory_data["interaction_count"] = existing.get("interaction_count", 0) + 1
-        
-        success = await self.short_term.store(
+        # Stores and increments the interaction count in one atomic round-trip
+        interaction_count = await self.short_term.store_counted(
             key=conversation_id,
             data=memory_data,
             ttl=ttl or 3600  # 1 hour default TTL
         )
+        if interaction_count is None:
+            return False
+        memory_data["interaction_count"] = interaction_count
         
-        # Check if consolidation is needed
-        if memory_data["interaction_count"] >= self.consolidation_settings["short_to_long_threshold"]:
+        if self._crosses_consolidation_threshold(interaction_count):
             await self._consolidate_to_long_term(conversation_id, memory_data)
         
-        return success
+        return True
     
     async def get_short_term(self, conversation_id: str) -> Optional[Dict[str, Any]]:
         """Retrieve conversation context from short-term memory"""
@@ -161,16 +189,28 @@ class MemoryManager:
     ) -> bool:
         """Update existing short-term memory context"""
         
-        existing = await self.get_short_term(conversation_id)
-        if not existing:
+        # Merged atomically next to the data; concurrent updates are not lost
+        interaction_count = await self.short_term.update_context(
+            conversation_id,
+            context_updates,
+            last_updated=datetime.now().isoformat()
+        )
+        if interaction_count is None:
             return False
         
-        # Merge updates
-        existing["context"].update(context_updates)
-        existing["last_updated"] = datetime.now().isoformat()
-        existing["interaction_count"] = existing.get("interaction_count", 0) + 1
+        # Agent turns after the first arrive here, so updates can trigger consolidation too
+        if self._crosses_consolidation_threshold(interaction_count):
+            memory_data = await self.short_term.get(conversation_id)
+            if memory_data:
+                await self._consolidate_to_long_term(conversation_id, memory_data)
         
-        return await self.short_term.store(conversation_id, existing)
+        return True
+    
+    def _crosses_consolidation_threshold(self, interaction_count: int) -> bool:
+        """Whether the increment that produced interaction_count reached the threshold"""
+        # Stores and updates both add one, so each conversation consolidates exactly once
+        threshold = self.consolidation_settings["short_to_long_threshold"]
+        return interaction_count - 1 < threshold <= interaction_count
     
     # Long-term memory methods
     async def store_long_term(
@@ -189,11 +229,43 @@ class MemoryManager:
             "rfm_score": await self._calculate_rfm_score(lead_id, interaction_history)
         }
         
-        return await self.long_term.store(lead_id, memory_data)
+        self._invalidate_long_term(lead_id)
+        try:
+            return await self.long_term.store(lead_id, memory_data)
+        finally:
+            # Reads that started while the write was in flight must not cache
+            self._invalidate_long_term(lead_id)
+    
+    async def append_long_term_interaction(
+        self,
+        lead_id: str,
+        interaction: Dict[str, Any],
+        preferences: Dict[str, Any]
+    ) -> bool:
+        """Append one interaction to an existing long-term profile"""
+        
+        # Only the new record is written; the RFM score is refreshed from the stored history
+        self._invalidate_long_term(lead_id)
+        try:
+            return await self.long_term.append_interaction(lead_id, interaction, preferences)
+        finally:
+            self._invalidate_long_term(lead_id)
+    
+    def _invalidate_long_term(self, lead_id: str):
+        """Drop the cached profile and stop in-flight reads from re-caching it"""
+        self._long_term_cache.pop(lead_id, None)
+        self._long_term_generation += 1
     
     async def get_long_term(self, lead_id: str) -> Optional[Dict[str, Any]]:
         """Retrieve customer data from long-term memory"""
-        return await self.long_term.get(lead_id)
+        profile = self._long_term_cache.get(lead_id)
+        if profile is None:
+            generation = self._long_term_generation
+            profile = await self.long_term.get(lead_id)
+            # A write that began during the read may not be reflected in profile
+            if profile is not None and self._long_term_generation == generation:
+                self._long_term_cache[lead_id] = profile
+        return profile
     
     async def get_historical_performance(
         self, 
@@ -215,7 +287,14 @@ class MemoryManager:
         episode["episode_id"] = episode_id
         episode["stored_at"] = datetime.now().isoformat()
         
-        return await self.episodic.store(episode_id, episode)
+        # Extracted once here so semantic learning never re-reads whole episodes
+        episode["concepts"] = self._extract_concepts(episode)
+        
+        stored = await self.episodic.store(episode_id, episode)
+        if stored:
+            # Cached results no longer include every matching episode
+            self._episodic_cache.clear()
+        return stored
     
     async def search_episodic_memory(
         self, 
@@ -232,11 +311,23 @@ class MemoryManager:
         if agent_type:
             filters["agent_type"] = agent_type
         
-        return await self.episodic.search_similar(
+        # Filters and limit are part of the key so differently scoped searches never share results
+        namespace = (agent_type, limit)
+        embedding = await self.episodic.embed(query_text)
+        if embedding is not None:
+            cached = self._episodic_cache.lookup(namespace, embedding)
+            if cached is not None:
+                return cached
+        
+        results = await self.episodic.search_similar(
             query_text=query_text,
             filters=filters,
             limit=limit
         )
+        # Without a local query embedding (ChromaDB embeds queries) there is nothing to key on
+        if embedding is not None:
+            self._episodic_cache.put(namespace, embedding, results)
+        return results
     
     # Semantic memory methods
     async def store_knowledge_triple(
@@ -347,13 +438,10 @@ class MemoryManager:
         
         if existing_long_term:
             # Update existing long-term memory
-            existing_long_term["preferences"].update(preferences)
-            existing_long_term["interaction_history"].append(interaction_record)
-            
-            await self.store_long_term(
+            await self.append_long_term_interaction(
                 lead_id=lead_id,
-                preferences=existing_long_term["preferences"],
-                interaction_history=existing_long_term["interaction_history"]
+                interaction=interaction_record,
+                preferences=preferences
             )
         else:
             # Create new long-term memory
@@ -367,16 +455,13 @@ class MemoryManager:
         return True
     
     async def run_memory_consolidation(self):
-        """Background task for memory consolidation and cleanup"""
+        """Background task for memory cleanup and semantic learning (short-term consolidation runs inline)"""
         
         while True:
             try:
                 # Clean up expired short-term memory
                 await self.short_term.cleanup_expired()
                 
-                # Consolidate high-frequency interactions
-                await self._consolidate_frequent_interactions()
-                
                 # Update semantic relationships
                 await self._update_semantic_relationships()
                 
@@ -387,37 +472,35 @@ class MemoryManager:
                 logger.error(f"Memory consolidation error: {e}")
                 await asyncio.sleep(60)  # Retry after 1 minute on error
     
-    async def _consolidate_frequent_interactions(self):
-        """Identify and consolidate frequently accessed short-term memories"""
-        
-        # Get all active short-term memories
-        active_memories = await self.short_term.get_all_active()
-        
-        for conversation_id, data in active_memories.items():
-            interaction_count = data.get("interaction_count", 0)
-            
-            if interaction_count >= self.consolidation_settings["short_to_long_threshold"]:
-                await self._consolidate_to_long_term(conversation_id, data)
-    
     async def _update_semantic_relationships(self):
         """Update semantic relationships based on interaction patterns"""
         
-        # Get recent successful interactions
-        recent_successes = await self.episodic.get_recent_successes(limit=100)
+        # Concepts of recent successful interactions, extracted when they were stored
+        recent_concepts = await self.episodic.get_recent_concepts(limit=100)
+        
+        # Keep each concept pair once at its best score
+        weights: Dict[tuple, float] = {}
+        for episode in recent_concepts:
+            weight = episode["outcome_score"]
+            for concept_pair in episode["concepts"]:
+                key = (concept_pair["subject"], concept_pair["object"])
+                if weights.get(key, -np.inf) < weight:
+                    weights[key] = weight
+        
+        triples = [
+            {
+                "subject": subject,
+                "predicate": "related_to",
+                "object": obj,
+                "weight": weight,
+                "source": "episodic_learning"
+            }
+            for (subject, obj), weight in weights.items()
+        ]
         
-        for episode in recent_successes:
-            # Extract concepts and relationships
-            concepts = self._extract_concepts(episode)
-            
-            # Store relationships in semantic memory
-            for concept_pair in concepts:
-                await self.store_knowledge_triple(
-                    subject=concept_pair["subject"],
-                    predicate="related_to",
-                    obj=concept_pair["object"],
-                    weight=episode.get("outcome_score", 0.5),
-                    source="episodic_learning"
-                )
+        # Store relationships in semantic memory in bulk
+        if triples:
+            await self.semantic.store_triples_bulk(triples)
     
     # Helper methods
     async def _calculate_rfm_score(
@@ -430,16 +513,28 @@ class MemoryManager:
         if not interaction_history:
             return 0.0
         
-        # Recency (0-1): How recent was last interaction
-        last_interaction = max(
-            interaction_history, 
-            key=lambda x: x.get("timestamp", "")
-        )
-        
-        last_timestamp = datetime.fromisoformat(
-            last_interaction.get("timestamp", datetime.now().isoformat())
-        )
-        days_since = (datetime.now() - last_timestamp).days
+        # Recency (0-1): How recent was last interaction (entries without a timestamp are ignored)
+        now = datetime.now()
+        if len(interaction_history) < RFM_VECTORIZE_MIN_HISTORY:
+            timestamps = [x["timestamp"] for x in interaction_history if x.get("timestamp")]
+            if timestamps:
+                latest = max(datetime.fromisoformat(ts) for ts in timestamps)
+                if latest.tzinfo is not None:
+                    latest = latest.astimezone(timezone.utc).replace(tzinfo=None)
+                days_since = (now - latest).days
+            else:
+                days_since = 0
+        else:
+            timestamps = np.array(
+                [x.get("timestamp") or "NaT" for x in interaction_history],
+                dtype="datetime64[s]"
+            )
+            timestamps = timestamps[~np.isnat(timestamps)]
+            if timestamps.size:
+                elapsed = np.datetime64(now, "s") - timestamps.max()
+                days_since = int(elapsed // np.timedelta64(1, "D"))
+            else:
+                days_since = 0
         recency_score = max(0, 1 - (days_since / 30))  # Decay over 30 days
         
         # Frequency (0-1): Number of interactions normalized
@@ -497,17 +592,11 @@ class MemoryManager:
     def _context_to_search_text(self, context: Dict[str, Any]) -> str:
         """Convert context dictionary to searchable text"""
         
-        text_parts = []
-        
-        for key, value in context.items():
-            if isinstance(value, str):
-                text_parts.append(f"{key}: {value}")
-            elif isinstance(value, (list, dict)):
-                text_parts.append(f"{key}: {json.dumps(value)}")
-            else:
-                text_parts.append(f"{key}: {str(value)}")
-        
-        return " ".join(text_parts)
+        return " ".join(
+            f"{key}: {orjson.dumps(value, option=orjson.OPT_SERIALIZE_NUMPY).decode()}"
+            if isinstance(value, (list, dict)) else f"{key}: {value}"
+            for key, value in context.items()
+        )
     
     def _extract_concepts(self, episode: Dict[str, Any]) -> List[Dict[str, str]]:
         """Extract concept relationships from successful episodes"""
@@ -538,11 +627,19 @@ class MemoryManager:
     async def get_memory_status(self) -> Dict[str, Any]:
         """Get status of all memory subsystems"""
         
+        short_term, long_term, episodic, semantic = await asyncio.gather(
+            self.short_term.get_status(),
+            self.long_term.get_status(),
+            self.episodic.get_status(),
+            self.semantic.get_status()
+        )
+        
         return {
-            "short_term": await self.short_term.get_status(),
-            "long_term": await self.long_term.get_status(),
-            "episodic": await self.episodic.get_status(),
-            "semantic": await self.semantic.get_status(),
+            "short_term": short_term,
+            "long_term": long_term,
+            "episodic": episodic,
+            "semantic": semantic,
+            "episodic_cache": self._episodic_cache.get_status(),
             "consolidation_settings": self.consolidation_settings,
             "initialized": self.initialized
         }
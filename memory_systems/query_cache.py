@@ -0,0 +1,100 @@
+"""
+Query Cache Implementation
+
+In-process cache of episodic search results keyed by query embedding.
+A query whose embedding is close enough to a cached one reuses its results.
+"""
+
+import copy
+from typing import Dict, Any, Optional, List, Hashable
+import logging
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Rows allocated for a namespace on first insert; grown by doubling up to max_entries
+INITIAL_CAPACITY = 64
+
+
+class _Bucket:
+    """Embeddings and results cached for one namespace (ring buffer once full)"""
+    
+    __slots__ = ("vectors", "results", "count", "next_slot")
+    
+    def __init__(self, dimension: int, capacity: int):
+        self.vectors = np.empty((capacity, dimension), dtype=np.float32)
+        self.results: List[List[Dict[str, Any]]] = []
+        self.count = 0
+        self.next_slot = 0
+
+
+class QueryCache:
+    """
+    Similarity-keyed cache for episodic memory searches
+    
+    Features:
+    - Cosine lookup against cached unit-length query embeddings
+    - Separate namespaces so different filters never share results
+    - Bounded size with oldest-first replacement
+    - Hit/miss counters for status reporting
+    """
+    
+    def __init__(self, threshold: float = 0.95, max_entries: int = 10000):
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self._buckets: Dict[Hashable, _Bucket] = {}
+        self.hits = 0
+        self.misses = 0
+    
+    def lookup(self, namespace: Hashable, embedding: np.ndarray) -> Optional[List[Dict[str, Any]]]:
+        """Return cached results for a similar query, or None"""
+        bucket = self._buckets.get(namespace)
+        if bucket is not None and bucket.count:
+            scores = bucket.vectors[:bucket.count] @ embedding
+            best = int(np.argmax(scores))
+            if scores[best] >= self.threshold:
+                self.hits += 1
+                # Deep copies, so callers can modify results (and their nested
+                # contexts) without touching the cache
+                return copy.deepcopy(bucket.results[best])
+        
+        self.misses += 1
+        return None
+    
+    def put(self, namespace: Hashable, embedding: np.ndarray, results: List[Dict[str, Any]]) -> None:
+        """Cache the results of a query"""
+        bucket = self._buckets.get(namespace)
+        if bucket is None:
+            bucket = _Bucket(len(embedding), min(INITIAL_CAPACITY, self.max_entries))
+            self._buckets[namespace] = bucket
+        
+        results = copy.deepcopy(results)
+        if bucket.count < self.max_entries:
+            if bucket.count == len(bucket.vectors):
+                grown = np.empty((min(2 * bucket.count, self.max_entries), bucket.vectors.shape[1]), dtype=np.float32)
+                grown[:bucket.count] = bucket.vectors
+                bucket.vectors = grown
+            slot = bucket.count
+            bucket.count += 1
+            bucket.results.append(results)
+        else:
+            # Full: overwrite the oldest entry
+            slot = bucket.next_slot
+            bucket.next_slot = (slot + 1) % self.max_entries
+            bucket.results[slot] = results
+        
+        bucket.vectors[slot] = embedding
+    
+    def clear(self) -> None:
+        """Drop all cached results (e.g. after new episodes are stored)"""
+        self._buckets.clear()
+    
+    def get_status(self) -> Dict[str, Any]:
+        """Get cache statistics"""
+        return {
+            "entries": sum(bucket.count for bucket in self._buckets.values()),
+            "hits": self.hits,
+            "misses": self.misses,
+            "threshold": self.threshold
+        }
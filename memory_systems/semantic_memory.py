@@ -7,22 +7,167 @@ Provides graph traversal queries and relationship exploration.
 
 import json
 import asyncio
-from typing import Dict, Any, Optional, List
+import itertools
+from collections import deque
+from typing import Dict, Any, Optional, List, Hashable, Tuple
 from datetime import datetime
 import logging
 
+import numpy as np
+from cachetools import TTLCache
+
 try:
     import networkx as nx
 except ImportError:
     nx = None
 
 try:
-    from neo4j import AsyncGraphDatabase
+    from scipy.sparse import csr_matrix
+    from scipy.sparse.csgraph import breadth_first_order
+except ImportError:
+    csr_matrix = None
+    breadth_first_order = None
+
+try:
+    from neo4j import AsyncGraphDatabase, RoutingControl
 except ImportError:
     AsyncGraphDatabase = None
+    RoutingControl = None
 
 logger = logging.getLogger(__name__)
 
+# Triples written per UNWIND statement in bulk stores
+TRIPLE_BATCH_SIZE = 1000
+
+# Basic marketing concepts (name, attributes) loaded into every new knowledge graph
+DEFAULT_CONCEPTS = [
+    # Channels
+    ("email_marketing", {"type": "channel", "category": "digital"}),
+    ("social_media", {"type": "channel", "category": "digital"}),
+    ("content_marketing", {"type": "channel", "category": "digital"}),
+    ("paid_search", {"type": "channel", "category": "paid"}),
+    ("organic_search", {"type": "channel", "category": "organic"}),
+    
+    # Strategies
+    ("lead_nurturing", {"type": "strategy", "category": "engagement"}),
+    ("retargeting", {"type": "strategy", "category": "optimization"}),
+    ("personalization", {"type": "strategy", "category": "engagement"}),
+    ("segmentation", {"type": "strategy", "category": "targeting"}),
+    
+    # Outcomes
+    ("conversion", {"type": "outcome", "value": "high"}),
+    ("engagement", {"type": "outcome", "value": "medium"}),
+    ("awareness", {"type": "outcome", "value": "low"}),
+    
+    # Industries
+    ("technology", {"type": "industry", "fit": "high"}),
+    ("financial_services", {"type": "industry", "fit": "high"}),
+    ("healthcare", {"type": "industry", "fit": "medium"}),
+    ("retail", {"type": "industry", "fit": "medium"}),
+]
+
+# Default relationships between them (source, target, attributes)
+DEFAULT_RELATIONSHIPS = [
+    # Channel -> Strategy relationships
+    ("email_marketing", "lead_nurturing", {"type": "enables", "strength": 0.9}),
+    ("social_media", "engagement", {"type": "drives", "strength": 0.8}),
+    ("content_marketing", "lead_nurturing", {"type": "supports", "strength": 0.8}),
+    ("paid_search", "retargeting", {"type": "enables", "strength": 0.7}),
+    
+    # Strategy -> Outcome relationships
+    ("lead_nurturing", "conversion", {"type": "leads_to", "strength": 0.8}),
+    ("personalization", "engagement", {"type": "improves", "strength": 0.9}),
+    ("segmentation", "conversion", {"type": "optimizes", "strength": 0.7}),
+    ("retargeting", "conversion", {"type": "increases", "strength": 0.6}),
+    
+    # Industry -> Strategy relationships
+    ("technology", "personalization", {"type": "prefers", "strength": 0.8}),
+    ("financial_services", "content_marketing", {"type": "responds_to", "strength": 0.7}),
+    ("healthcare", "email_marketing", {"type": "suitable_for", "strength": 0.6}),
+]
+
+# Fallback graphs up to this size keep all-pairs shortest paths (rebuilt lazily after writes)
+ALL_PAIRS_MAX_NODES = 500
+
+
+
+class _CSRGraph:
+    """Read-only compressed sparse row snapshot of the fallback graph (requires scipy)"""
+    
+    __slots__ = ("node_index", "nodes", "matrix")
+    
+    def __init__(self, adj: Dict[str, Dict[str, Dict[str, Any]]]):
+        self.nodes: List[str] = list(adj)
+        self.node_index: Dict[str, int] = {node: i for i, node in enumerate(self.nodes)}
+        
+        indptr = np.zeros(len(self.nodes) + 1, dtype=np.int32)
+        indices: List[int] = []
+        for i, successors in enumerate(adj.values()):
+            indices.extend(self.node_index[neighbor] for neighbor in successors)
+            indptr[i + 1] = len(indices)
+        
+        # Unweighted sparse matrix for scipy's csgraph routines
+        self.matrix = csr_matrix(
+            (np.ones(len(indices), dtype=np.int8), np.asarray(indices, dtype=np.int32), indptr),
+            shape=(len(self.nodes), len(self.nodes))
+        )
+    
+    def shortest_path(self, source: str, target: str) -> Optional[List[str]]:
+        """Fewest-hop directed path from a BFS over the matrix (requires scipy)"""
+        start, end = self.node_index[source], self.node_index[target]
+        _, predecessors = breadth_first_order(self.matrix, start, directed=True, return_predecessors=True)
+        if start != end and predecessors[end] < 0:
+            return None
+        
+        path = [end]
+        while path[-1] != start:
+            path.append(int(predecessors[path[-1]]))
+        return [self.nodes[i] for i in reversed(path)]
+
+
+# Single-triple Neo4j writes are queued and merged in batches of up to
+# TRIPLE_BATCH_SIZE, flushed at the latest this long after the first arrives
+TRIPLE_FLUSH_INTERVAL = 0.05  # seconds
+
+MERGE_TRIPLES_CYPHER = """
+    UNWIND $rows AS row
+    MERGE (s:Concept {name: row.subject})
+    MERGE (o:Concept {name: row.object})
+    MERGE (s)-[r:RELATED {type: row.predicate}]->(o)
+    SET r.weight = row.weight, r.source = row.source, r.created_at = datetime()
+"""
+
+
+def _triple_query(has_subject: bool, has_predicate: bool, has_object: bool) -> str:
+    """Cypher for query_triples filtering on the given parts of the triple"""
+    conditions = [
+        condition for condition, present in (
+            ("s.name = $subject", has_subject),
+            ("r.type = $predicate", has_predicate),
+            ("o.name = $object", has_object)
+        ) if present
+    ]
+    where_clause = "WHERE " + " AND ".join(conditions) if conditions else ""
+    
+    return f"""
+        MATCH (s:Concept)-[r:RELATED]->(o:Concept)
+        {where_clause}
+        RETURN s.name as subject, r.type as predicate, o.name as object, 
+               r.weight as weight, r.source as source
+    """
+
+
+# query_triples Cypher keyed by (has_subject, has_predicate, has_object); fixed query
+# texts let Neo4j reuse one cached plan per combination
+TRIPLE_QUERIES = {
+    flags: _triple_query(*flags) for flags in itertools.product((False, True), repeat=3)
+}
+
+# Memoized query_triples / get_related_concepts results; local writes clear the cache,
+# the TTL bounds staleness from writers in other processes
+QUERY_CACHE_SIZE = 1024
+QUERY_CACHE_TTL = 300  # seconds
+
 
 class SemanticMemory:
     """
@@ -33,13 +178,34 @@ class SemanticMemory:
     - Relationship traversal and discovery
     - Concept association mapping
     - Domain knowledge storage
+    - Memoized triple and traversal queries
+    - Batched Neo4j writes
     """
     
     def __init__(self, config: Dict[str, Any]):
         self.config = config
         self.driver = None
+        self.database = self.config.get("database", "neo4j")
         self.graph = None  # NetworkX fallback
         
+        # Fallback edges by predicate ({type: {(subject, object): None}}) for predicate-only queries
+        self._by_predicate: Dict[str, Dict[tuple, None]] = {}
+        
+        # Fallback shortest paths ({source: {target: path}}); None until (re)built
+        self._all_pairs: Optional[Dict[str, Dict[str, List[str]]]] = None
+        
+        # Fallback CSR snapshot for scipy shortest paths on large graphs; None until
+        # (re)built after writes
+        self._csr: Optional[_CSRGraph] = None
+        self._query_cache: TTLCache = TTLCache(
+            maxsize=self.config.get("query_cache_size", QUERY_CACHE_SIZE),
+            ttl=self.config.get("query_cache_ttl", QUERY_CACHE_TTL)
+        )
+        
+        # Pending Neo4j triple writes and their callers' futures; None is the shutdown sentinel
+        self._triple_queue: asyncio.Queue[Optional[Tuple[Dict[str, Any], asyncio.Future]]] = asyncio.Queue()
+        self._flusher: Optional[asyncio.Task] = None
+        
     async def initialize(self):
         """Initialize Neo4j connection"""
         try:
@@ -52,9 +218,18 @@ class SemanticMemory:
                 self.driver = AsyncGraphDatabase.driver(uri, auth=(user, password))
                 
                 # Test connection
-                async with self.driver.session() as session:
-                    result = await session.run("RETURN 1 as test")
-                    await result.single()
+                await self._read("RETURN 1 as test")
+                
+                # Concept lookups by name start with an index seek instead of a label scan
+                for statement in (
+                    "CREATE INDEX concept_name IF NOT EXISTS FOR (n:Concept) ON (n.name)",
+                    "CREATE INDEX related_type IF NOT EXISTS FOR ()-[r:RELATED]-() ON (r.type)"
+                ):
+                    await self._write(statement)
+                
+                await self._initialize_default_knowledge()
+                
+                self._flusher = asyncio.create_task(self._flush_triples())
                 
                 logger.info("Semantic memory (Neo4j) initialized successfully")
                 
@@ -73,65 +248,93 @@ class SemanticMemory:
             else:
                 logger.error("Neither Neo4j nor NetworkX available for semantic memory")
     
+    async def _read(self, query: str, **params) -> List[Any]:
+        """Run a read query with the driver's managed execute_query, returning its records"""
+        records, _, _ = await self.driver.execute_query(
+            query,
+            parameters_=params,
+            database_=self.database,
+            routing_=RoutingControl.READ
+        )
+        return records
+    
+    async def _write(self, query: str, **params) -> List[Any]:
+        """Run a write query with the driver's managed execute_query, returning its records"""
+        records, _, _ = await self.driver.execute_query(
+            query,
+            parameters_=params,
+            database_=self.database,
+            routing_=RoutingControl.WRITE
+        )
+        return records
+    
     async def _initialize_default_knowledge(self):
         """Initialize default marketing knowledge graph"""
-        if not self.graph:
+        if self.driver:
+            await self._bulk_load_concepts(DEFAULT_CONCEPTS, DEFAULT_RELATIONSHIPS)
             return
         
-        # Add basic marketing concepts and relationships
-        concepts = [
-            # Channels
-            ("email_marketing", {"type": "channel", "category": "digital"}),
-            ("social_media", {"type": "channel", "category": "digital"}),
-            ("content_marketing", {"type": "channel", "category": "digital"}),
-            ("paid_search", {"type": "channel", "category": "paid"}),
-            ("organic_search", {"type": "channel", "category": "organic"}),
-            
-            # Strategies
-            ("lead_nurturing", {"type": "strategy", "category": "engagement"}),
-            ("retargeting", {"type": "strategy", "category": "optimization"}),
-            ("personalization", {"type": "strategy", "category": "engagement"}),
-            ("segmentation", {"type": "strategy", "category": "targeting"}),
-            
-            # Outcomes
-            ("conversion", {"type": "outcome", "value": "high"}),
-            ("engagement", {"type": "outcome", "value": "medium"}),
-            ("awareness", {"type": "outcome", "value": "low"}),
-            
-            # Industries
-            ("technology", {"type": "industry", "fit": "high"}),
-            ("financial_services", {"type": "industry", "fit": "high"}),
-            ("healthcare", {"type": "industry", "fit": "medium"}),
-            ("retail", {"type": "industry", "fit": "medium"}),
-        ]
+        if self.graph is None:
+            return
         
         # Add nodes
-        for concept, attributes in concepts:
+        for concept, attributes in DEFAULT_CONCEPTS:
             self.graph.add_node(concept, **attributes)
         
-        # Add relationships
-        relationships = [
-            # Channel -> Strategy relationships
-            ("email_marketing", "lead_nurturing", {"type": "enables", "strength": 0.9}),
-            ("social_media", "engagement", {"type": "drives", "strength": 0.8}),
-            ("content_marketing", "lead_nurturing", {"type": "supports", "strength": 0.8}),
-            ("paid_search", "retargeting", {"type": "enables", "strength": 0.7}),
-            
-            # Strategy -> Outcome relationships
-            ("lead_nurturing", "conversion", {"type": "leads_to", "strength": 0.8}),
-            ("personalization", "engagement", {"type": "improves", "strength": 0.9}),
-            ("segmentation", "conversion", {"type": "optimizes", "strength": 0.7}),
-            ("retargeting", "conversion", {"type": "increases", "strength": 0.6}),
-            
-            # Industry -> Strategy relationships
-            ("technology", "personalization", {"type": "prefers", "strength": 0.8}),
-            ("financial_services", "content_marketing", {"type": "responds_to", "strength": 0.7}),
-            ("healthcare", "email_marketing", {"type": "suitable_for", "strength": 0.6}),
-        ]
-        
         # Add edges
-        for source, target, attributes in relationships:
-            self.graph.add_edge(source, target, **attributes)
+        for source, target, attributes in DEFAULT_RELATIONSHIPS:
+            self._add_graph_edge(source, target, **attributes)
+        
+        self._all_pairs = dict(nx.all_pairs_shortest_path(self.graph))
+    
+    async def _bulk_load_concepts(
+        self,
+        concepts: List[Tuple[str, Dict[str, Any]]],
+        relationships: List[Tuple[str, str, Dict[str, Any]]]
+    ):
+        """MERGE concepts and their relationships into Neo4j with one UNWIND statement each"""
+        await self._write(
+            """
+            UNWIND $concepts AS c
+            MERGE (n:Concept {name: c.name})
+            SET n += c.attrs
+            """,
+            concepts=[{"name": name, "attrs": attributes} for name, attributes in concepts]
+        )
+        await self._write(
+            """
+            UNWIND $relationships AS r
+            MATCH (s:Concept {name: r.src}), (o:Concept {name: r.dst})
+            MERGE (s)-[e:RELATED {type: r.type}]->(o)
+            SET e += r.attrs
+            """,
+            relationships=[
+                {
+                    "src": source,
+                    "dst": target,
+                    "type": attributes.get("type", "related_to"),
+                    "attrs": {k: v for k, v in attributes.items() if k != "type"}
+                }
+                for source, target, attributes in relationships
+            ]
+        )
+    
+    def _add_graph_edge(self, subject: str, obj: str, **attributes):
+        """Add or update a NetworkX fallback edge, creating concept nodes and indexing its type"""
+        if not self.graph.has_node(subject):
+            self.graph.add_node(subject, type="concept")
+        if not self.graph.has_node(obj):
+            self.graph.add_node(obj, type="concept")
+        
+        previous = self.graph._adj[subject].get(obj)
+        if previous is not None:
+            self._by_predicate.get(previous.get("type", "related_to"), {}).pop((subject, obj), None)
+        
+        self.graph.add_edge(subject, obj, **attributes)
+        self._all_pairs = None
+        self._csr = None
+        edge_type = self.graph._adj[subject][obj].get("type", "related_to")
+        self._by_predicate.setdefault(edge_type, {})[(subject, obj)] = None
     
     async def store_triple(self, triple: Dict[str, Any]) -> bool:
         """Store knowledge triple (subject, predicate, object)"""
@@ -141,36 +344,131 @@ class SemanticMemory:
             obj = triple["object"]
             weight = triple.get("weight", 1.0)
             source = triple.get("source", "system")
+            stored = True
+            
+            if self.driver:
+                row = {
+                    "subject": subject,
+                    "predicate": predicate,
+                    "object": obj,
+                    "weight": weight,
+                    "source": source
+                }
+                if self._flusher is None or self._flusher.done():
+                    # No batch writer (shutting down); a queued row would never be written
+                    await self._write_triples([row])
+                else:
+                    # Store in Neo4j as part of the next batch
+                    future = asyncio.get_running_loop().create_future()
+                    self._triple_queue.put_nowait((row, future))
+                    stored = await future
+            
+            elif self.graph is not None:
+                # Store in NetworkX
+                self._add_graph_edge(subject, obj,
+                                     type=predicate,
+                                     weight=weight,
+                                     source=source,
+                                     created_at=datetime.now().isoformat())
+            
+            else:
+                # No backend, e.g. after cleanup()
+                stored = False
+            
+            self._query_cache.clear()
+            return stored
+            
+        except Exception as e:
+            logger.error(f"Error storing semantic triple: {e}")
+            return False
+    
+    async def store_triples_bulk(self, triples: List[Dict[str, Any]]) -> bool:
+        """Store many knowledge triples, one UNWIND statement per 1000"""
+        try:
+            rows = [
+                {
+                    "subject": triple["subject"],
+                    "predicate": triple["predicate"],
+                    "object": triple["object"],
+                    "weight": triple.get("weight", 1.0),
+                    "source": triple.get("source", "system")
+                }
+                for triple in triples
+            ]
             
             if self.driver:
                 # Store in Neo4j
-                async with self.driver.session() as session:
-                    await session.run("""
-                        MERGE (s:Concept {name: $subject})
-                        MERGE (o:Concept {name: $object})
-                        MERGE (s)-[r:RELATED {type: $predicate}]->(o)
-                        SET r.weight = $weight, r.source = $source, r.created_at = datetime()
-                    """, subject=subject, object=obj, predicate=predicate, weight=weight, source=source)
+                await self._write_triples(rows)
             
-            elif self.graph:
+            elif self.graph is not None:
                 # Store in NetworkX
-                if not self.graph.has_node(subject):
-                    self.graph.add_node(subject, type="concept")
-                if not self.graph.has_node(obj):
-                    self.graph.add_node(obj, type="concept")
-                
-                self.graph.add_edge(subject, obj, 
-                                  type=predicate, 
-                                  weight=weight, 
-                                  source=source,
-                                  created_at=datetime.now().isoformat())
+                created_at = datetime.now().isoformat()
+                for row in rows:
+                    self._add_graph_edge(row["subject"], row["object"],
+                                         type=row["predicate"],
+                                         weight=row["weight"],
+                                         source=row["source"],
+                                         created_at=created_at)
             
+            self._query_cache.clear()
             return True
             
         except Exception as e:
-            logger.error(f"Error storing semantic triple: {e}")
+            logger.error(f"Error storing semantic triples: {e}")
             return False
     
+    async def _write_triples(self, rows: List[Dict[str, Any]]):
+        """MERGE triple rows into Neo4j, one UNWIND statement per TRIPLE_BATCH_SIZE"""
+        for start in range(0, len(rows), TRIPLE_BATCH_SIZE):
+            await self._write(MERGE_TRIPLES_CYPHER, rows=rows[start:start + TRIPLE_BATCH_SIZE])
+    
+    async def _flush_triples(self):
+        """Write queued single-triple stores in batches, resolving each caller's future"""
+        loop = asyncio.get_running_loop()
+        
+        while True:
+            batch = []
+            stopping = False
+            deadline = loop.time() + TRIPLE_FLUSH_INTERVAL
+            
+            item = await self._triple_queue.get()
+            while True:
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+                if len(batch) >= TRIPLE_BATCH_SIZE:
+                    break
+                
+                try:
+                    item = self._triple_queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    # A lone write goes out at once (later ones queue up behind it);
+                    # a batch already forming gets until the deadline to fill up
+                    remaining = deadline - loop.time()
+                    if len(batch) == 1 or remaining <= 0:
+                        break
+                    await asyncio.sleep(remaining)
+                    try:
+                        item = self._triple_queue.get_nowait()
+                    except asyncio.QueueEmpty:
+                        break
+            
+            if batch:
+                try:
+                    await self._write_triples([row for row, _ in batch])
+                    stored = True
+                except Exception as e:
+                    logger.error(f"Error storing {len(batch)} semantic triples: {e}")
+                    stored = False
+                
+                for _, future in batch:
+                    if not future.done():
+                        future.set_result(stored)
+            
+            if stopping:
+                return
+    
     async def query_triples(
         self, 
         subject: Optional[str] = None,
@@ -178,52 +476,47 @@ class SemanticMemory:
         object: Optional[str] = None
     ) -> List[Dict[str, Any]]:
         """Query knowledge triples"""
+        key = ("triples", subject, predicate, object)
+        cached = self._cached(key)
+        if cached is not None:
+            return cached
+        
         try:
             triples = []
             
             if self.driver:
                 # Query Neo4j
-                query_parts = []
-                params = {}
+                query = TRIPLE_QUERIES[(bool(subject), bool(predicate), bool(object))]
+                params = {
+                    name: value for name, value in
+                    (("subject", subject), ("predicate", predicate), ("object", object)) if value
+                }
                 
+                for record in await self._read(query, **params):
+                    triples.append({
+                        "subject": record["subject"],
+                        "predicate": record["predicate"],
+                        "object": record["object"],
+                        "weight": record["weight"],
+                        "source": record["source"]
+                    })
+            
+            elif self.graph is not None:
+                # Query NetworkX, starting from the most selective index
+                adj = self.graph._adj
                 if subject:
-                    query_parts.append("s.name = $subject")
-                    params["subject"] = subject
-                if predicate:
-                    query_parts.append("r.type = $predicate")
-                    params["predicate"] = predicate
-                if object:
-                    query_parts.append("o.name = $object")
-                    params["object"] = object
-                
-                where_clause = "WHERE " + " AND ".join(query_parts) if query_parts else ""
+                    successors = adj.get(subject, {})
+                    if object:
+                        successors = {object: successors[object]} if object in successors else {}
+                    edges = ((subject, target, data) for target, data in successors.items())
+                elif object:
+                    edges = ((source, object, data) for source, data in self.graph._pred.get(object, {}).items())
+                elif predicate:
+                    edges = ((s, o, adj[s][o]) for s, o in self._by_predicate.get(predicate, {}))
+                else:
+                    edges = self.graph.edges(data=True)
                 
-                query = f"""
-                    MATCH (s:Concept)-[r:RELATED]->(o:Concept)
-                    {where_clause}
-                    RETURN s.name as subject, r.type as predicate, o.name as object, 
-                           r.weight as weight, r.source as source
-                """
-                
-                async with self.driver.session() as session:
-                    result = await session.run(query, **params)
-                    async for record in result:
-                        triples.append({
-                            "subject": record["subject"],
-                            "predicate": record["predicate"],
-                            "object": record["object"],
-                            "weight": record["weight"],
-                            "source": record["source"]
-                        })
-            
-            elif self.graph:
-                # Query NetworkX
-                for source_node, target_node, edge_data in self.graph.edges(data=True):
-                    # Apply filters
-                    if subject and source_node != subject:
-                        continue
-                    if object and target_node != object:
-                        continue
+                for source_node, target_node, edge_data in edges:
                     if predicate and edge_data.get("type") != predicate:
                         continue
                     
@@ -235,6 +528,7 @@ class SemanticMemory:
                         "source": edge_data.get("source", "system")
                     })
             
+            self._remember(key, triples)
             return triples
             
         except Exception as e:
@@ -248,79 +542,104 @@ class SemanticMemory:
         depth: int = 2
     ) -> List[Dict[str, Any]]:
         """Get concepts related to given concept"""
+        key = ("related", concept, frozenset(relationship_types) if relationship_types else None, depth)
+        cached = self._cached(key)
+        if cached is not None:
+            return cached
+        
         try:
             related = []
             
             if self.driver:
-                # Query Neo4j with variable depth
-                type_filter = ""
-                if relationship_types:
-                    type_filter = f"WHERE r.type IN {relationship_types}"
-                
+                # Query Neo4j with variable depth; Cypher cannot take the path bound
+                # as a parameter, so only that validated integer is formatted in
                 query = f"""
-                    MATCH (start:Concept {{name: $concept}})-[r:RELATED*1..{depth}]->(related:Concept)
-                    {type_filter}
+                    MATCH (start:Concept {{name: $concept}})-[r:RELATED*1..{int(depth)}]->(related:Concept)
+                    WHERE $types IS NULL OR all(rel IN r WHERE rel.type IN $types)
                     RETURN related.name as concept, 
                            [rel in r | rel.type] as path_types,
                            [rel in r | rel.weight] as path_weights
                 """
                 
-                async with self.driver.session() as session:
-                    result = await session.run(query, concept=concept)
-                    async for record in result:
-                        related.append({
-                            "concept": record["concept"],
-                            "path_types": record["path_types"],
-                            "path_weights": record["path_weights"],
-                            "distance": len(record["path_types"])
-                        })
+                types = list(relationship_types) if relationship_types else None
+                for record in await self._read(query, concept=concept, types=types):
+                    related.append({
+                        "concept": record["concept"],
+                        "path_types": record["path_types"],
+                        "path_weights": record["path_weights"],
+                        "distance": len(record["path_types"])
+                    })
             
-            elif self.graph:
+            elif self.graph is not None:
                 # Use NetworkX traversal
                 if concept not in self.graph:
                     return []
                 
-                # BFS traversal up to specified depth
-                visited = set()
-                queue = [(concept, 0, [])]  # (node, depth, path)
+                # Raw successor dicts ({neighbor: edge_data}); skips building view objects per node
+                adj = self.graph._adj
+                allowed_types = frozenset(relationship_types) if relationship_types else None
                 
-                while queue:
-                    current, curr_depth, path = queue.pop(0)
+                # BFS traversal up to specified depth; each concept is reported once,
+                # via the first (shortest) path that reaches it
+                node_count = len(adj)
+                seen = {concept}  # The starting concept is never included
+                queue = deque([(concept, 0, [])])  # (node, depth, path)
+                
+                # Stop early once every other node has been reached
+                while queue and len(seen) < node_count:
+                    current, curr_depth, path = queue.popleft()
                     
-                    if current in visited or curr_depth >= depth:
+                    if curr_depth >= depth:
                         continue
                     
-                    visited.add(current)
-                    
                     # Get neighbors
-                    for neighbor in self.graph.neighbors(current):
-                        if neighbor not in visited:
-                            edge_data = self.graph.get_edge_data(current, neighbor)
-                            edge_type = edge_data.get("type", "related_to")
-                            
-                            # Apply relationship type filter
-                            if relationship_types and edge_type not in relationship_types:
-                                continue
-                            
-                            new_path = path + [edge_type]
-                            
-                            if curr_depth + 1 < depth:
-                                queue.append((neighbor, curr_depth + 1, new_path))
-                            
-                            if neighbor != concept:  # Don't include the starting concept
-                                related.append({
-                                    "concept": neighbor,
-                                    "path_types": new_path,
-                                    "distance": curr_depth + 1,
-                                    "relationship": edge_type
-                                })
+                    for neighbor, edge_data in adj[current].items():
+                        if neighbor in seen:
+                            continue
+                        
+                        edge_type = edge_data.get("type", "related_to")
+                        
+                        # Apply relationship type filter
+                        if allowed_types is not None and edge_type not in allowed_types:
+                            continue
+                        
+                        seen.add(neighbor)
+                        new_path = path + [edge_type]
+                        
+                        if curr_depth + 1 < depth:
+                            queue.append((neighbor, curr_depth + 1, new_path))
+                        
+                        related.append({
+                            "concept": neighbor,
+                            "path_types": new_path,
+                            "distance": curr_depth + 1,
+                            "relationship": edge_type
+                        })
             
+            self._remember(key, related)
             return related
             
         except Exception as e:
             logger.error(f"Error getting related concepts: {e}")
             return []
     
+    def _graph_csr(self) -> _CSRGraph:
+        """CSR snapshot of the fallback graph, rebuilt on first read after a write"""
+        if self._csr is None:
+            self._csr = _CSRGraph(self.graph._adj)
+        return self._csr
+    
+    def _cached(self, key: Hashable) -> Optional[List[Dict[str, Any]]]:
+        """Copy of a memoized query result, or None"""
+        results = self._query_cache.get(key)
+        if results is None:
+            return None
+        return [dict(result) for result in results]
+    
+    def _remember(self, key: Hashable, results: List[Dict[str, Any]]) -> None:
+        """Memoize a query result (copied, so callers can modify what they get)"""
+        self._query_cache[key] = [dict(result) for result in results]
+    
     async def get_shortest_path(self, source: str, target: str) -> Optional[List[str]]:
         """Find shortest path between two concepts"""
         try:
@@ -331,14 +650,21 @@ class SemanticMemory:
                     RETURN [node in nodes(path) | node.name] as path
                 """
                 
-                async with self.driver.session() as session:
-                    result = await session.run(query, source=source, target=target)
-                    record = await result.single()
-                    return record["path"] if record else None
+                records = await self._read(query, source=source, target=target)
+                return records[0]["path"] if records else None
             
-            elif self.graph:
+            elif self.graph is not None:
                 # Use NetworkX shortest path
                 if self.graph.has_node(source) and self.graph.has_node(target):
+                    if self._all_pairs is None and self.graph.number_of_nodes() <= ALL_PAIRS_MAX_NODES:
+                        self._all_pairs = dict(nx.all_pairs_shortest_path(self.graph))
+                    if self._all_pairs is not None:
+                        path = self._all_pairs[source].get(target)
+                        return list(path) if path is not None else None
+                    
+                    if breadth_first_order is not None:
+                        return self._graph_csr().shortest_path(source, target)
+                    
                     try:
                         path = nx.shortest_path(self.graph, source, target)
                         return path
@@ -355,22 +681,21 @@ class SemanticMemory:
         """Get semantic memory status"""
         try:
             if self.driver:
-                async with self.driver.session() as session:
-                    # Count nodes and relationships
-                    result = await session.run("MATCH (n:Concept) RETURN count(n) as node_count")
-                    node_count = (await result.single())["node_count"]
-                    
-                    result = await session.run("MATCH ()-[r:RELATED]->() RETURN count(r) as rel_count")
-                    rel_count = (await result.single())["rel_count"]
-                    
-                    return {
-                        "type": "neo4j",
-                        "status": "connected",
-                        "concept_count": node_count,
-                        "relationship_count": rel_count
-                    }
+                # Count nodes and relationships
+                records = await self._read("MATCH (n:Concept) RETURN count(n) as node_count")
+                node_count = records[0]["node_count"]
+                
+                records = await self._read("MATCH ()-[r:RELATED]->() RETURN count(r) as rel_count")
+                rel_count = records[0]["rel_count"]
+                
+                return {
+                    "type": "neo4j",
+                    "status": "connected",
+                    "concept_count": node_count,
+                    "relationship_count": rel_count
+                }
             
-            elif self.graph:
+            elif self.graph is not None:
                 return {
                     "type": "networkx",
                     "status": "active",
@@ -393,5 +718,13 @@ class SemanticMemory:
     
     async def cleanup(self):
         """Cleanup connections"""
+        flusher, self._flusher = self._flusher, None
+        if flusher is not None:
+            # Write out whatever is still queued before closing the driver; stores
+            # arriving meanwhile see no flusher and write directly
+            await self._triple_queue.put(None)
+            await flusher
+        
         if self.driver:
-            await self.driver.close()
+            driver, self.driver = self.driver, None
+            await driver.close()
@@ -5,12 +5,14 @@ Redis-based implementation for current conversation contexts and session data.
 Provides high-speed access with TTL-based expiration.
 """
 
-import json
 import asyncio
-from typing import Dict, Any, Optional
-from datetime import datetime, timedelta
+import heapq
+import time
+from typing import Dict, Any, Optional, List, Tuple
 import logging
 
+import orjson
+
 try:
     import redis.asyncio as redis
 except ImportError:
@@ -18,6 +20,37 @@ except ImportError:
 
 logger = logging.getLogger(__name__)
 
+# Atomically stores ARGV[1] (a JSON object without interaction_count) with TTL ARGV[2],
+# appending interaction_count = previous count + 1; returns the new count
+STORE_COUNTED_SCRIPT = """
+local n = 1
+local cur = redis.call('GET', KEYS[1])
+if cur then
+    local ok, previous = pcall(cjson.decode, cur)
+    if ok and type(previous) == 'table' and tonumber(previous.interaction_count) then
+        n = previous.interaction_count + 1
+    end
+end
+local count = '"interaction_count":' .. string.format('%d', n) .. '}'
+local payload
+if ARGV[1] == '{}' then
+    payload = '{' .. count
+else
+    payload = string.sub(ARGV[1], 1, -2) .. ',' .. count
+end
+redis.call('SET', KEYS[1], payload, 'EX', ARGV[2])
+return n
+"""
+
+
+def _serialize(data: Dict[str, Any]) -> bytes:
+    """Encode a memory entry as JSON"""
+    return orjson.dumps(
+        data,
+        default=str,
+        option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+    )
+
 
 class ShortTermMemory:
     """
@@ -34,6 +67,11 @@ class ShortTermMemory:
         self.config = config
         self.redis_client = None
         self.connection_pool = None
+        self._store_counted = None
+        
+        # In-memory fallback expiry times as (monotonic clock seconds, key); entries are
+        # left behind when a key is rewritten and skipped when popped
+        self._expiry_heap: List[Tuple[float, str]] = []
         
     async def initialize(self):
         """Initialize Redis connection"""
@@ -48,7 +86,8 @@ class ShortTermMemory:
                 host=self.config.get("host", "localhost"),
                 port=self.config.get("port", 6379),
                 db=self.config.get("db", 0),
-                decode_responses=True,
+                # Values stay bytes, which orjson parses directly without a UTF-8 decode pass
+                decode_responses=False,
                 max_connections=20
             )
             
@@ -57,6 +96,9 @@ class ShortTermMemory:
             
             # Test connection
             await self.redis_client.ping()
+            
+            # Runs via EVALSHA, loading the script on first use
+            self._store_counted = self.redis_client.register_script(STORE_COUNTED_SCRIPT)
             logger.info("Short-term memory (Redis) initialized successfully")
             
         except Exception as e:
@@ -67,7 +109,7 @@ class ShortTermMemory:
     async def store(self, key: str, data: Dict[str, Any], ttl: Optional[int] = None) -> bool:
         """Store data with optional TTL"""
         try:
-            serialized_data = json.dumps(data, default=str)
+            serialized_data = _serialize(data)
             
             if self.redis_client:
                 # Use Redis
@@ -77,11 +119,13 @@ class ShortTermMemory:
                     await self.redis_client.set(key, serialized_data)
             else:
                 # Use in-memory fallback
-                expiry = datetime.now() + timedelta(seconds=ttl) if ttl else None
+                expiry = time.monotonic() + ttl if ttl else None
                 self.memory_store[key] = {
                     "data": serialized_data,
                     "expires_at": expiry
                 }
+                if expiry is not None:
+                    heapq.heappush(self._expiry_heap, (expiry, key))
             
             return True
             
@@ -89,6 +133,75 @@ class ShortTermMemory:
             logger.error(f"Error storing short-term memory: {e}")
             return False
     
+    async def store_counted(self, key: str, data: Dict[str, Any], ttl: int) -> Optional[int]:
+        """
+        Store data with interaction_count carried over from the existing entry plus one
+        
+        The read and write happen in one atomic script, so concurrent stores to
+        the same key never lose an increment. Returns the new count, or None on error.
+        """
+        try:
+            data = {k: v for k, v in data.items() if k != "interaction_count"}
+            
+            if self.redis_client:
+                count = await self._store_counted(keys=[key], args=[_serialize(data), ttl])
+                return int(count)
+            
+            # In-memory fallback (single event loop, so read-then-write is already atomic)
+            existing = await self.get(key)
+            count = existing.get("interaction_count", 0) + 1 if existing else 1
+            await self.store(key, {**data, "interaction_count": count}, ttl)
+            return count
+            
+        except Exception as e:
+            logger.error(f"Error storing short-term memory: {e}")
+            return None
+    
+    @staticmethod
+    def _merge_context(data: Dict[str, Any], context_updates: Dict[str, Any], last_updated: str):
+        """Apply a context update to an entry in place, counting it as an interaction"""
+        data.setdefault("context", {}).update(context_updates)
+        data["last_updated"] = last_updated
+        data["interaction_count"] = data.get("interaction_count", 0) + 1
+    
+    async def update_context(
+        self,
+        key: str,
+        context_updates: Dict[str, Any],
+        last_updated: str
+    ) -> Optional[int]:
+        """
+        Merge updates into an entry's context, keeping its TTL
+        
+        Uses an optimistic WATCH/MULTI transaction, retried if another client
+        writes the key in between. Returns the new interaction_count, or None
+        when the entry does not exist.
+        """
+        try:
+            if self.redis_client:
+                async def merge(pipe) -> Optional[int]:
+                    data = self._decode(await pipe.get(key))
+                    if data is None:
+                        return None
+                    self._merge_context(data, context_updates, last_updated)
+                    pipe.multi()
+                    pipe.set(key, _serialize(data), keepttl=True)
+                    return data["interaction_count"]
+                
+                return await self.redis_client.transaction(merge, key, value_from_callable=True)
+            
+            # In-memory fallback
+            data = await self.get(key)
+            if data is None:
+                return None
+            self._merge_context(data, context_updates, last_updated)
+            self.memory_store[key]["data"] = _serialize(data)
+            return data["interaction_count"]
+            
+        except Exception as e:
+            logger.error(f"Error updating short-term memory: {e}")
+            return None
+    
     async def get(self, key: str) -> Optional[Dict[str, Any]]:
         """Retrieve data by key"""
         try:
@@ -96,16 +209,16 @@ class ShortTermMemory:
                 # Use Redis
                 data = await self.redis_client.get(key)
                 if data:
-                    return json.loads(data)
+                    return orjson.loads(data)
             else:
                 # Use in-memory fallback
                 entry = self.memory_store.get(key)
                 if entry:
                     # Check expiry
-                    if entry["expires_at"] and datetime.now() > entry["expires_at"]:
+                    if entry["expires_at"] and time.monotonic() > entry["expires_at"]:
                         del self.memory_store[key]
                         return None
-                    return json.loads(entry["data"])
+                    return orjson.loads(entry["data"])
             
             return None
             
@@ -113,6 +226,16 @@ class ShortTermMemory:
             logger.error(f"Error retrieving short-term memory: {e}")
             return None
     
+    @staticmethod
+    def _decode(data: Any) -> Optional[Dict[str, Any]]:
+        """Decode a GET reply, treating errors and non-JSON values as missing"""
+        if not isinstance(data, (str, bytes)) or not data:
+            return None
+        try:
+            return orjson.loads(data)
+        except ValueError:
+            return None
+    
     async def delete(self, key: str) -> bool:
         """Delete data by key"""
         try:
@@ -130,44 +253,21 @@ class ShortTermMemory:
             return False
     
     async def cleanup_expired(self):
-        """Clean up expired entries (for in-memory fallback)"""
+        """Clean up expired entries (for in-memory fallback; Redis expires keys itself)"""
         if not self.redis_client:
-            current_time = datetime.now()
-            expired_keys = [
-                key for key, entry in self.memory_store.items()
-                if entry["expires_at"] and current_time > entry["expires_at"]
-            ]
-            
-            for key in expired_keys:
-                del self.memory_store[key]
-            
-            if expired_keys:
-                logger.info(f"Cleaned up {len(expired_keys)} expired short-term memory entries")
-    
-    async def get_all_active(self) -> Dict[str, Dict[str, Any]]:
-        """Get all active conversations (for consolidation)"""
-        active_memories = {}
-        
-        try:
-            if self.redis_client:
-                # Get all keys from Redis
-                keys = await self.redis_client.keys("*")
-                for key in keys:
-                    data = await self.get(key)
-                    if data:
-                        active_memories[key] = data
-            else:
-                # Use in-memory store
-                current_time = datetime.now()
-                for key, entry in self.memory_store.items():
-                    if not entry["expires_at"] or current_time <= entry["expires_at"]:
-                        active_memories[key] = json.loads(entry["data"])
-            
-            return active_memories
+            # Pop only what has expired instead of scanning every entry
+            current_time = time.monotonic()
+            expired = 0
+            while self._expiry_heap and self._expiry_heap[0][0] < current_time:
+                expiry, key = heapq.heappop(self._expiry_heap)
+                entry = self.memory_store.get(key)
+                # Stale heap entries belong to keys since rewritten or deleted
+                if entry is not None and entry["expires_at"] == expiry:
+                    del self.memory_store[key]
+                    expired += 1
             
-        except Exception as e:
-            logger.error(f"Error getting active memories: {e}")
-            return {}
+            if expired:
+                logger.info(f"Cleaned up {expired} expired short-term memory entries")
     
     async def get_status(self) -> Dict[str, Any]:
         """Get memory system status"""
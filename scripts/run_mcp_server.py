@@ -40,7 +40,7 @@ async def main():
         print("  • POST /rpc - JSON-RPC 2.0 endpoint")
         print("  • WS /ws/{agent_id} - WebSocket for agents")
         print("  • GET /agents/status - Agent status")
-        print("  • GET /resources/access-log - Resource access logs")
+        print("  • GET /resources/access-log - Resource access logs (NDJSON)")
         print("\nPress Ctrl+C to stop the server\n")
         
         # Start server
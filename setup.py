@@ -0,0 +1,28 @@
+"""
+Optional native build
+
+Compiles the API model definitions ahead of time with Cython so model
+construction and default factories run without bytecode dispatch:
+
+    python setup.py build_ext --inplace
+
+The pure-Python modules remain the source of truth; when no compiled
+extension is present they are imported as usual. Without Cython installed
+the package builds as pure Python.
+"""
+
+from setuptools import Extension, setup
+
+try:
+    from Cython.Build import cythonize
+except ImportError:
+    cythonize = None
+
+
+setup(
+    name="marketing-multi-agent-system",
+    ext_modules=cythonize(
+        [Extension("api.models", ["api/models.py"])],
+        compiler_directives={"language_level": 3}
+    ) if cythonize else [],
+)
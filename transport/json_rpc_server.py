@@ -6,7 +6,8 @@ Handles JSON-RPC method registration and request processing for the MCP server.
 
 import json
 import asyncio
-from typing import Dict, Any, Callable, Optional
+import inspect
+from typing import Dict, Any, Callable, Optional, Tuple
 import logging
 from datetime import datetime
 
@@ -28,11 +29,28 @@ class JSONRPCServer:
         self.methods: Dict[str, Callable] = {}
         self.request_count = 0
         
-    def register_method(self, method_name: str, handler: Callable):
-        """Register a method handler"""
+        # Per-method call convention: (params_as_dict, accepts agent_context, is coroutine)
+        self._call_specs: Dict[str, Tuple[bool, bool, bool]] = {}
+        
+    def register_method(self, method_name: str, handler: Callable, params_as_dict: bool = False):
+        """Register a method handler
+        
+        Params are passed as keyword arguments, or with params_as_dict the
+        handler is called as handler(params, agent_context).
+        """
         self.methods[method_name] = handler
+        self._call_specs[method_name] = self._call_spec(handler, params_as_dict)
         logger.info(f"Registered JSON-RPC method: {method_name}")
     
+    @staticmethod
+    def _call_spec(handler: Callable, params_as_dict: bool = False) -> Tuple[bool, bool, bool]:
+        """Inspect a handler once, at registration rather than per request"""
+        return (
+            params_as_dict,
+            "agent_context" in inspect.signature(handler).parameters,
+            asyncio.iscoroutinefunction(handler)
+        )
+    
     async def handle_request(
         self, 
         method: str, 
@@ -60,22 +78,26 @@ class JSONRPCServer:
             
             # Get method handler
             handler = self.methods[method]
+            spec = self._call_specs.get(method)
+            if spec is None:
+                # Added to self.methods directly rather than through register_method
+                spec = self._call_specs[method] = self._call_spec(handler)
+            params_as_dict, accepts_context, is_coroutine = spec
             
-            # Prepare parameters
-            call_params = params or {}
-            
-            # Add agent context if handler supports it
-            if agent_context:
-                import inspect
-                sig = inspect.signature(handler)
-                if 'agent_context' in sig.parameters:
+            if params_as_dict:
+                call = handler(params or {}, agent_context or {})
+            else:
+                # Prepare parameters
+                call_params = params or {}
+                
+                # Add agent context if handler supports it
+                if agent_context and accepts_context:
                     call_params['agent_context'] = agent_context
+                
+                call = handler(**call_params)
             
             # Call method handler
-            if asyncio.iscoroutinefunction(handler):
-                result = await handler(**call_params)
-            else:
-                result = handler(**call_params)
+            result = await call if is_coroutine else call
             
             # Log successful request
             duration = (datetime.now() - start_time).total_seconds() * 1000
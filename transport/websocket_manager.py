@@ -4,19 +4,41 @@ WebSocket Manager Implementation
 Manages WebSocket connections for real-time agent communication.
 """
 
-import json
 import asyncio
+import uuid
 from typing import Dict, Any, List, Optional
 from datetime import datetime
 import logging
 
+import orjson
+
 try:
     from fastapi import WebSocket
 except ImportError:
     WebSocket = None
 
+from api.models import WebSocketMessage
+
 logger = logging.getLogger(__name__)
 
+# Broadcasts are sent concurrently in chunks, yielding to the event loop between chunks
+BROADCAST_CHUNK_SIZE = 50
+
+# Redis pub/sub channel used to fan broadcasts out across server workers
+BROADCAST_CHANNEL = "mcp:broadcast"
+
+# Redis pub/sub channel carrying messages for agents connected to another worker
+DIRECT_CHANNEL = "mcp:direct"
+
+# Redis hash of agents connected to any worker ({agent_id: JSON with worker and connected_at})
+AGENT_REGISTRY_KEY = "mcp:agents"
+
+# Redis list per offline agent holding its queued messages
+MESSAGE_QUEUE_PREFIX = "mcp:queue:"
+
+# Delay before resubscribing after the pub/sub connection drops
+PUBSUB_RECONNECT_DELAY = 1.0  # seconds
+
 
 class WebSocketManager:
     """
@@ -27,6 +49,8 @@ class WebSocketManager:
     - Message broadcasting
     - Connection health monitoring
     - Message queuing
+    - Cross-worker broadcasts, direct messages, agent registry and
+      offline queues via Redis
     """
     
     def __init__(self):
@@ -34,6 +58,118 @@ class WebSocketManager:
         self.agent_metadata: Dict[str, Dict[str, Any]] = {}
         self.message_queue: Dict[str, List[Dict[str, Any]]] = {}
         
+        # Shared message bus (set when running multiple workers)
+        self.redis_client = None
+        self.broadcast_channel = BROADCAST_CHANNEL
+        self.worker_id = uuid.uuid4().hex
+        self._pubsub = None
+        self._pubsub_task: Optional[asyncio.Task] = None
+        
+    async def attach_redis(self, redis_client, channel: str = BROADCAST_CHANNEL):
+        """Route messages through Redis so every worker reaches agents connected anywhere
+        
+        Agents are registered in a shared hash while connected. A worker that
+        exits without detaching leaves its entries behind until those agents
+        reconnect.
+        """
+        self.redis_client = redis_client
+        self.broadcast_channel = channel
+        await self._subscribe()
+        self._pubsub_task = asyncio.create_task(self._listen_for_broadcasts())
+        
+        # Agents that connected before Redis was attached
+        for agent_id, metadata in self.agent_metadata.items():
+            await self._register_agent(agent_id, metadata["connected_at"])
+        
+        logger.info(f"Broadcasts routed through Redis channel {channel}")
+    
+    async def detach_redis(self):
+        """Stop listening for cross-worker messages and unregister local agents"""
+        if self._pubsub_task is not None:
+            self._pubsub_task.cancel()
+            self._pubsub_task = None
+        
+        await self._close_pubsub()
+        
+        if self.redis_client is not None:
+            for agent_id in list(self.active_connections):
+                await self._unregister_agent(agent_id)
+        
+        self.redis_client = None
+    
+    async def _subscribe(self):
+        """Open the pub/sub connection for broadcasts and direct messages"""
+        self._pubsub = self.redis_client.pubsub()
+        await self._pubsub.subscribe(self.broadcast_channel, DIRECT_CHANNEL)
+    
+    async def _close_pubsub(self):
+        """Close the pub/sub connection, ignoring errors from a dead one"""
+        if self._pubsub is not None:
+            try:
+                await self._pubsub.close()
+            except Exception as e:
+                logger.debug(f"Error closing Redis pub/sub: {e}")
+            self._pubsub = None
+    
+    async def _listen_for_broadcasts(self):
+        """Deliver messages published by any worker to local agents, resubscribing if the connection drops"""
+        while True:
+            try:
+                if self._pubsub is None:
+                    await self._subscribe()
+                    logger.info("Resubscribed to Redis broadcast channels")
+                
+                async for item in self._pubsub.listen():
+                    if item["type"] != "message":
+                        continue
+                    
+                    channel = item["channel"]
+                    if isinstance(channel, bytes):
+                        channel = channel.decode()
+                    
+                    payload = item["data"]
+                    if isinstance(payload, str):
+                        payload = payload.encode()
+                    
+                    try:
+                        if channel == DIRECT_CHANNEL:
+                            envelope = orjson.loads(payload)
+                            await self._deliver_direct(envelope["agent_id"], envelope["worker"], envelope["message"])
+                        else:
+                            frame = orjson.loads(payload)
+                            await self._deliver_broadcast(payload, frame["sender"], frame.get("targets"))
+                    except Exception as e:
+                        logger.error(f"Error delivering message from Redis: {e}")
+                
+                raise ConnectionError("subscription ended")
+                
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Redis pub/sub connection lost: {e} - resubscribing in {PUBSUB_RECONNECT_DELAY}s")
+                await self._close_pubsub()
+                await asyncio.sleep(PUBSUB_RECONNECT_DELAY)
+    
+    async def _deliver_direct(self, agent_id: str, worker: str, message: Dict[str, Any]):
+        """Send a message routed from another worker to an agent registered here"""
+        # Every worker sees the message; the registered one delivers it, or
+        # re-routes/queues it if the agent has disconnected meanwhile
+        if agent_id in self.active_connections or worker == self.worker_id:
+            await self.send_to_agent(agent_id, message)
+    
+    async def _register_agent(self, agent_id: str, connected_at: datetime):
+        """Record in Redis that an agent is connected to this worker"""
+        await self.redis_client.hset(AGENT_REGISTRY_KEY, agent_id, orjson.dumps({
+            "worker": self.worker_id,
+            "connected_at": connected_at.isoformat()
+        }))
+    
+    async def _unregister_agent(self, agent_id: str):
+        """Remove an agent's registry entry unless it has since connected to another worker"""
+        entry = await self.redis_client.hget(AGENT_REGISTRY_KEY, agent_id)
+        if entry is not None and orjson.loads(entry).get("worker") == self.worker_id:
+            await self.redis_client.hdel(AGENT_REGISTRY_KEY, agent_id)
+    
     async def connect_agent(self, agent_id: str, websocket: WebSocket):
         """Register a new agent connection"""
         self.active_connections[agent_id] = websocket
@@ -43,11 +179,25 @@ class WebSocketManager:
             "message_count": 0
         }
         
+        if self.redis_client is not None:
+            try:
+                await self._register_agent(agent_id, self.agent_metadata[agent_id]["connected_at"])
+                
+                # Deliver messages queued by any worker while the agent was offline
+                async with self.redis_client.pipeline(transaction=True) as pipe:
+                    pipe.lrange(MESSAGE_QUEUE_PREFIX + agent_id, 0, -1)
+                    pipe.delete(MESSAGE_QUEUE_PREFIX + agent_id)
+                    queued, _ = await pipe.execute()
+                for payload in queued:
+                    await websocket.send_bytes(payload)
+            except Exception as e:
+                logger.error(f"Error syncing {agent_id} with Redis: {e}")
+        
         # Deliver any queued messages
         if agent_id in self.message_queue:
             for message in self.message_queue[agent_id]:
                 try:
-                    await websocket.send_text(json.dumps(message))
+                    await websocket.send_bytes(orjson.dumps(message, default=str))
                 except Exception as e:
                     logger.error(f"Error delivering queued message to {agent_id}: {e}")
             
@@ -64,14 +214,25 @@ class WebSocketManager:
         if agent_id in self.agent_metadata:
             del self.agent_metadata[agent_id]
         
+        if self.redis_client is not None:
+            try:
+                await self._unregister_agent(agent_id)
+            except Exception as e:
+                logger.error(f"Error unregistering {agent_id} from Redis: {e}")
+        
         logger.info(f"Agent {agent_id} disconnected")
     
     async def send_to_agent(self, agent_id: str, message: Dict[str, Any]) -> bool:
-        """Send message to specific agent"""
+        """Send message to specific agent
+        
+        Returns False when the message was queued because the agent is offline.
+        With Redis attached, agents on other workers are reached through the
+        direct channel.
+        """
         if agent_id in self.active_connections:
             try:
                 websocket = self.active_connections[agent_id]
-                await websocket.send_text(json.dumps(message))
+                await websocket.send_bytes(orjson.dumps(message, default=str))
                 
                 # Update metadata
                 self.agent_metadata[agent_id]["last_seen"] = datetime.now()
@@ -84,6 +245,26 @@ class WebSocketManager:
                 # Remove broken connection
                 await self.disconnect_agent(agent_id)
                 return False
+        elif self.redis_client is not None:
+            entry = await self.redis_client.hget(AGENT_REGISTRY_KEY, agent_id)
+            worker = orjson.loads(entry)["worker"] if entry is not None else None
+            if worker is not None and worker != self.worker_id:
+                # Connected to another worker
+                await self.redis_client.publish(DIRECT_CHANNEL, orjson.dumps({
+                    "agent_id": agent_id,
+                    "worker": worker,
+                    "message": message
+                }, default=str))
+                return True
+            
+            # Queue where whichever worker the agent connects to will find it
+            await self.redis_client.rpush(MESSAGE_QUEUE_PREFIX + agent_id, orjson.dumps({
+                **message,
+                "queued_at": datetime.now().isoformat()
+            }, default=str))
+            
+            logger.info(f"Queued message for offline agent {agent_id}")
+            return False
         else:
             # Queue message for later delivery
             if agent_id not in self.message_queue:
@@ -97,13 +278,59 @@ class WebSocketManager:
             logger.info(f"Queued message for offline agent {agent_id}")
             return False
     
+    async def _send_bytes(self, agent_id: str, payload: bytes) -> bool:
+        """Send a pre-encoded frame to a connected agent"""
+        try:
+            await self.active_connections[agent_id].send_bytes(payload)
+            
+            # Update metadata
+            self.agent_metadata[agent_id]["last_seen"] = datetime.now()
+            self.agent_metadata[agent_id]["message_count"] += 1
+            
+            return True
+            
+        except Exception as e:
+            logger.error(f"Error sending message to {agent_id}: {e}")
+            # Remove broken connection
+            await self.disconnect_agent(agent_id)
+            return False
+    
     async def broadcast_to_agents(
         self, 
         message: Dict[str, Any], 
         sender: str,
-        target_agents: Optional[List[str]] = None
+        target_agents: Optional[List[str]] = None,
+        payload: Optional[bytes] = None
     ):
-        """Broadcast message to multiple agents"""
+        """Broadcast message to multiple agents
+        
+        Callers that already hold the encoded frame pass it as ``payload``.
+        """
+        
+        # Encode once and send the same frame to each target
+        if payload is None:
+            payload = WebSocketMessage(
+                type="broadcast",
+                data=message or {},
+                sender=sender,
+                targets=target_agents
+            ).to_bytes()
+        
+        if self.redis_client is not None:
+            # Each worker (this one included) delivers to its own connections
+            await self.redis_client.publish(self.broadcast_channel, payload)
+            logger.info(f"Broadcast from {sender} published to {self.broadcast_channel}")
+            return {}
+        
+        return await self._deliver_broadcast(payload, sender, target_agents)
+    
+    async def _deliver_broadcast(
+        self,
+        payload: bytes,
+        sender: str,
+        target_agents: Optional[List[str]] = None
+    ) -> Dict[str, bool]:
+        """Send an encoded broadcast frame to the locally connected targets"""
         
         # Determine target agents
         if target_agents:
@@ -112,16 +339,17 @@ class WebSocketManager:
             # Broadcast to all except sender
             targets = [aid for aid in self.active_connections.keys() if aid != sender]
         
-        # Send to each target
         results = {}
-        for agent_id in targets:
-            success = await self.send_to_agent(agent_id, {
-                "type": "broadcast",
-                "sender": sender,
-                "message": message,
-                "timestamp": datetime.now().isoformat()
-            })
-            results[agent_id] = success
+        for start in range(0, len(targets), BROADCAST_CHUNK_SIZE):
+            chunk = targets[start:start + BROADCAST_CHUNK_SIZE]
+            outcomes = await asyncio.gather(
+                *(self._send_bytes(agent_id, payload) for agent_id in chunk),
+                return_exceptions=True
+            )
+            for agent_id, outcome in zip(chunk, outcomes):
+                results[agent_id] = outcome is True
+            
+            await asyncio.sleep(0)
         
         logger.info(f"Broadcast from {sender} to {len(targets)} agents")
         return results
@@ -142,11 +370,33 @@ class WebSocketManager:
                 "message_count": metadata["message_count"]
             }
         
+        queue_sizes = {agent_id: len(queue) for agent_id, queue in self.message_queue.items()}
+        
+        if self.redis_client is not None:
+            # Agents connected to other workers, and queues shared by all workers
+            registry = await self.redis_client.hgetall(AGENT_REGISTRY_KEY)
+            for agent_id, entry in registry.items():
+                agent_id = agent_id.decode() if isinstance(agent_id, bytes) else agent_id
+                if agent_id not in status["agents"]:
+                    entry = orjson.loads(entry)
+                    status["agents"][agent_id] = {
+                        "status": "connected",
+                        "connected_at": entry["connected_at"],
+                        "worker": entry["worker"]
+                    }
+            status["total_connections"] = len(status["agents"])
+            
+            async for key in self.redis_client.scan_iter(match=MESSAGE_QUEUE_PREFIX + "*"):
+                key = key.decode() if isinstance(key, bytes) else key
+                agent_id = key[len(MESSAGE_QUEUE_PREFIX):]
+                queue_sizes[agent_id] = queue_sizes.get(agent_id, 0) + await self.redis_client.llen(key)
+            status["queued_messages"] = sum(queue_sizes.values())
+        
         # Add queued message info
-        for agent_id, queue in self.message_queue.items():
+        for agent_id, queued in queue_sizes.items():
             if agent_id not in status["agents"]:
                 status["agents"][agent_id] = {"status": "offline"}
-            status["agents"][agent_id]["queued_messages"] = len(queue)
+            status["agents"][agent_id]["queued_messages"] = queued
         
         return status
     